@@ -6,20 +6,76 @@ Fiido 电商网站产品爬虫模块
 """
 
 import logging
+import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
 from typing import List, Optional, Dict, Any
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
+from pydantic import ValidationError
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from core.models import Product, ProductVariant, Selectors
+from core.models import PRODUCT_LIST_ADAPTER, Product, ProductVariant, Selectors
 from core.cache import CrawlerCache
 
+try:
+    from selectolax.lexbor import LexborHTMLParser  # 可选依赖：基于 Lexbor 的快速 HTML 解析
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import orjson  # 可选依赖：更快的 JSON 解码
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# HTTP 连接池：分页和多个分类的请求复用 TCP/TLS 连接
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 64
+
+# Shopify JSON API 每页最多返回的商品数
+JSON_PAGE_SIZE = 250
+
+# 首页满页后每轮并发预取的页数
+JSON_PAGE_WINDOW = 4
+
+# 同一爬虫实例同时在途的 HTTP 请求上限（并发抓取多个分类时所有线程共享）
+MAX_CONCURRENT_REQUESTS = 8
+
+# 导航菜单中的分类链接（Shopify 常见模式），合并为一个选择器组，只遍历一次文档
+NAV_COLLECTION_LINK_SELECTOR = ', '.join((
+    '.site-nav a[href*="/collections/"]',
+    '.menu a[href*="/collections/"]',
+    '.navigation a[href*="/collections/"]',
+    'nav a[href*="/collections/"]',
+    'header a[href*="/collections/"]',
+    '.header a[href*="/collections/"]'
+))
+
+# 分类页中的商品链接（Shopify 常见模式），按优先级排列；有数量限制时先取前面的
+PRODUCT_LINK_SELECTORS = (
+    '.product-item a[href*="/products/"]',
+    '.product-card a[href*="/products/"]',
+    '.grid-item a[href*="/products/"]',
+    'a.product-link[href*="/products/"]',
+    'a[href*="/products/"]'
+)
+
+# 变体类型推断关键词：颜色/配置按子串匹配（预编译为正则），尺寸按整词匹配
+_COLOR_RE = re.compile('black|white|red|blue|green|yellow|gray|silver')
+_SIZE_WORDS = frozenset({'small', 'medium', 'large', 'xs', 's', 'm', 'l', 'xl', 'xxl'})
+_CONFIG_RE = re.compile('standard|pro|plus|premium|basic|advanced')
+
+# URL 标准化：去掉查询参数和锚点
+_STRIP_QS = re.compile(r'[?#].*$')
+
 
 class ProductCrawler:
     """Fiido 网站产品爬虫
@@ -35,7 +91,9 @@ class ProductCrawler:
         timeout: int = 30,
         max_retries: int = 3,
         use_cache: bool = True,
-        cache_ttl_hours: int = 24
+        cache_ttl_hours: int = 24,
+        max_workers: int = 10,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS
     ):
         """初始化产品爬虫
 
@@ -45,10 +103,19 @@ class ProductCrawler:
             max_retries: 最大重试次数
             use_cache: 是否启用缓存
             cache_ttl_hours: 缓存有效期（小时）
+            max_workers: discover_all 并发抓取分类的最大线程数
+            max_concurrent_requests: 所有线程合计同时在途的最大请求数
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.use_cache = use_cache
+        self.max_workers = max_workers
+
+        # 缓存元数据不是线程安全的，并发抓取时串行化缓存读写
+        self._cache_lock = threading.Lock()
+
+        # 分类线程和分页预取线程共享的请求名额，限制对网站的总并发
+        self._request_slots = threading.BoundedSemaphore(max_concurrent_requests)
 
         # 初始化缓存
         if use_cache:
@@ -57,7 +124,7 @@ class ProductCrawler:
         else:
             self.cache = None
 
-        # 配置带重试机制的 Session
+        # 配置带重试机制和连接池的 Session
         self.session = requests.Session()
         retry_strategy = Retry(
             total=max_retries,
@@ -65,7 +132,11 @@ class ProductCrawler:
             allowed_methods=["HEAD", "GET", "OPTIONS"],
             backoff_factor=1
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=retry_strategy
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
 
@@ -131,15 +202,14 @@ class ProductCrawler:
         Returns:
             分类URL集合
         """
-        response = self.session.get(url, timeout=self.timeout)
+        response = self._get(url)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        tree = self._parse_html(response.text)
         collection_links = set()
 
         # 策略1: 查找包含 /collections/ 的所有链接
-        for link in soup.find_all('a', href=True):
-            href = link['href']
+        for href in self._select_hrefs(tree, 'a[href]'):
             if '/collections/' in href and href != '/collections' and href != '/collections/':
                 # 标准化 URL
                 if href.startswith('http'):
@@ -153,32 +223,51 @@ class ProductCrawler:
                     href = '/' + href
 
                 # 移除查询参数和锚点
-                href = href.split('?')[0].split('#')[0]
+                href = _STRIP_QS.sub('', href)
 
                 # 过滤掉无效的路径
                 if self._is_valid_collection_path(href):
                     collection_links.add(href)
 
         # 策略2: 查找导航菜单中的分类链接（Shopify 常见模式）
-        nav_selectors = [
-            '.site-nav a[href*="/collections/"]',
-            '.menu a[href*="/collections/"]',
-            '.navigation a[href*="/collections/"]',
-            'nav a[href*="/collections/"]',
-            'header a[href*="/collections/"]',
-            '.header a[href*="/collections/"]'
-        ]
-
-        for selector in nav_selectors:
-            for link in soup.select(selector):
-                href = link.get('href', '')
-                if href and '/collections/' in href:
-                    href = href.split('?')[0].split('#')[0]
-                    if not href.startswith('http') and self._is_valid_collection_path(href):
-                        collection_links.add(href)
+        for href in self._select_hrefs(tree, NAV_COLLECTION_LINK_SELECTOR):
+            if href and '/collections/' in href:
+                href = _STRIP_QS.sub('', href)
+                if not href.startswith('http') and self._is_valid_collection_path(href):
+                    collection_links.add(href)
 
         return collection_links
 
+    def _parse_html(self, html: str):
+        """解析 HTML 文档
+
+        安装了 selectolax 时使用 Lexbor 解析器，否则回退到 BeautifulSoup
+        （使用 lxml 解析后端）。
+
+        Args:
+            html: HTML 文本
+
+        Returns:
+            LexborHTMLParser 或 BeautifulSoup 文档对象
+        """
+        if LexborHTMLParser is not None:
+            return LexborHTMLParser(html)
+        return BeautifulSoup(html, 'lxml')
+
+    def _select_hrefs(self, tree, selector: str) -> List[str]:
+        """获取 CSS 选择器匹配到的所有元素的 href 属性
+
+        Args:
+            tree: _parse_html 返回的文档对象
+            selector: CSS 选择器
+
+        Returns:
+            href 列表（元素没有 href 值时为空字符串）
+        """
+        if LexborHTMLParser is not None:
+            return [node.attributes.get('href') or '' for node in tree.css(selector)]
+        return [link.get('href', '') for link in tree.select(selector)]
+
     def _is_valid_collection_path(self, path: str) -> bool:
         """检查是否为有效的分类路径
 
@@ -282,6 +371,34 @@ class ProductCrawler:
             logger.error(f"Failed to discover products: {e}")
             raise
 
+    def discover_all(
+        self,
+        collection_paths: List[str],
+        limit: Optional[int] = None
+    ) -> List[Optional[List[Product]]]:
+        """并发地从多个分类中发现商品
+
+        使用最多 max_workers 个线程并发调用 discover_products，共享同一个
+        带连接池的 Session；实际同时在途的请求数受 max_concurrent_requests 限制。
+        单个分类抓取失败只记录日志，不影响其他分类。
+
+        Args:
+            collection_paths: 分类路径列表
+            limit: 每个分类的商品数量限制
+
+        Returns:
+            与 collection_paths 顺序一致的商品列表，抓取失败的分类为 None
+        """
+        def discover(collection_path: str) -> Optional[List[Product]]:
+            try:
+                return self.discover_products(collection_path, limit=limit)
+            except Exception as e:
+                logger.error(f"Failed to discover products from {collection_path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(discover, collection_paths))
+
     def _discover_products_via_json(
         self,
         collection_path: str,
@@ -300,40 +417,134 @@ class ProductCrawler:
         # 格式: /collections/{handle}/products.json (不是 /collections/{handle}.json)
         json_url = f"{self.base_url}{collection_path}/products.json"
         products = []
-        page = 1
 
-        while True:
-            # Shopify JSON API 分页参数
-            params = {'page': page, 'limit': 250}  # Shopify 最多支持每页250个商品
+        for page_products in self._iter_json_pages(json_url):
+            # 有数量限制时只解析还差的部分，解析失败的商品不计数，不够再继续
+            offset = 0
+            while offset < len(page_products) and not (limit and len(products) >= limit):
+                count = limit - len(products) if limit else len(page_products)
+                chunk = page_products[offset:offset + count]
+                offset += len(chunk)
+                products.extend(self._parse_products_from_json(chunk, collection_path))
+
             if limit and len(products) >= limit:
                 break
 
-            logger.debug(f"Fetching {json_url}?page={page}")
-            response = self.session.get(json_url, params=params, timeout=self.timeout)
-            response.raise_for_status()
+        return products
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """占用一个请求名额后发起 GET 请求"""
+        with self._request_slots:
+            return self.session.get(url, timeout=self.timeout, **kwargs)
+
+    def _fetch_json_page(self, json_url: str, page: int) -> List[Dict[str, Any]]:
+        """请求 Shopify JSON API 的一页商品
 
+        Args:
+            json_url: products.json 地址
+            page: 页码（从 1 开始）
+
+        Returns:
+            该页的商品 JSON 数据列表，没有商品时为空列表
+        """
+        logger.debug(f"Fetching {json_url}?page={page}")
+        params = {'page': page, 'limit': JSON_PAGE_SIZE}
+        response = self._get(json_url, params=params)
+        response.raise_for_status()
+
+        # orjson 直接解码原始字节，省去 requests 先解码为 str 再 json.loads
+        content = getattr(response, 'content', None)
+        if orjson is not None and isinstance(content, bytes):
+            data = orjson.loads(content)
+        else:
             data = response.json()
 
-            # Shopify 返回格式: {"products": [...]}
-            if 'products' not in data or not data['products']:
-                break
+        # Shopify 返回格式: {"products": [...]}
+        return data.get('products') or []
 
-            for product_data in data['products']:
-                if limit and len(products) >= limit:
-                    break
+    def _iter_json_pages(self, json_url: str):
+        """按页码顺序产出每页商品
 
-                product = self._parse_product_from_json(product_data, collection_path)
-                if product:
-                    products.append(product)
+        先单独请求第一页；第一页是满页时，之后每轮并发预取 JSON_PAGE_WINDOW 页，
+        遇到不满一页的页面即结束（之后预取的页面被丢弃）。
 
-            # 如果返回商品数量少于请求的limit，说明已到最后一页
-            if len(data['products']) < 250:
-                break
+        Args:
+            json_url: products.json 地址
 
-            page += 1
-            time.sleep(0.5)  # 避免请求过快
+        Yields:
+            每页的商品 JSON 数据列表
+        """
+        page_products = self._fetch_json_page(json_url, 1)
+        yield page_products
+        # 如果返回商品数量少于每页上限，说明已到最后一页
+        if len(page_products) < JSON_PAGE_SIZE:
+            return
+
+        next_page = 2
+        fetch_page = partial(self._fetch_json_page, json_url)
+        with ThreadPoolExecutor(max_workers=JSON_PAGE_WINDOW) as pool:
+            while True:
+                time.sleep(0.5)  # 避免请求过快
+                window = range(next_page, next_page + JSON_PAGE_WINDOW)
+                for page_products in pool.map(fetch_page, window):
+                    yield page_products
+                    if len(page_products) < JSON_PAGE_SIZE:
+                        return
+                next_page += JSON_PAGE_WINDOW
+
+    def _parse_products_from_json(
+        self,
+        products_data: List[Dict[str, Any]],
+        collection_path: str
+    ) -> List[Product]:
+        """批量解析一页 Shopify 商品 JSON 数据
 
-        return products
+        命中缓存的商品直接使用，其余商品先构造字段（共用同一个发现时间），
+        再用 PRODUCT_LIST_ADAPTER 一次性校验；批量校验失败时逐个校验，跳过无效商品。
+
+        Args:
+            products_data: Shopify 产品 JSON 数据列表
+            collection_path: 所属分类路径
+
+        Returns:
+            解析成功的 Product 对象列表（保持原始顺序）
+        """
+        products: List[Optional[Product]] = []
+        pending = []  # (在 products 中的位置, 商品 URL, 商品字段)
+
+        # 同一页商品共用一个发现时间，避免每个商品各自调用 datetime.now()
+        discovered_at = datetime.now()
+
+        for product_data in products_data:
+            try:
+                product_url = self._product_url(product_data)
+                cached = self._load_cached_product(product_url)
+                if cached:
+                    products.append(cached)
+                    continue
+
+                row = self._build_product_row(product_data, collection_path)
+            except Exception as e:
+                logger.error(f"Failed to parse product from JSON: {e}")
+                continue
+
+            if row is not None:
+                row['discovered_at'] = discovered_at
+                pending.append((len(products), product_url, row))
+                products.append(None)
+
+        if pending:
+            try:
+                validated = PRODUCT_LIST_ADAPTER.validate_python([row for _, _, row in pending])
+            except ValidationError:
+                validated = [self._validate_product_row(row) for _, _, row in pending]
+
+            for (position, product_url, _), product in zip(pending, validated):
+                products[position] = product
+                if product:
+                    self._cache_product(product_url, product)
+
+        return [product for product in products if product is not None]
 
     def _parse_product_from_json(
         self,
@@ -350,85 +561,127 @@ class ProductCrawler:
             Product 对象，解析失败返回 None
         """
         try:
-            # 构建商品 URL
-            handle = product_data.get('handle', '')
-            product_url = f"{self.base_url}/products/{handle}"
-
-            # 检查缓存
-            if self.use_cache and self.cache:
-                cached_data = self.cache.get(product_url)
-                if cached_data:
-                    try:
-                        return Product(**cached_data)
-                    except Exception as e:
-                        logger.warning(f"Failed to load from cache: {e}")
-
-            # 提取基本信息
-            product_id = str(product_data.get('id', ''))
-
-            # 提取价格范围
-            variants_data = product_data.get('variants', [])
-            prices = [float(v.get('price', 0)) for v in variants_data if v.get('price')]
-
-            if not prices:
-                logger.warning(f"Product {handle} has no valid prices, skipping")
-                return None
-
-            price_min = min(prices)
-            price_max = max(prices)
+            product_url = self._product_url(product_data)
+            cached = self._load_cached_product(product_url)
+            if cached:
+                return cached
 
-            # 提取变体信息
-            variants = []
-            for variant_data in variants_data:
-                variant = self._parse_variant_from_json(variant_data)
-                if variant:
-                    variants.append(variant)
+            row = self._build_product_row(product_data, collection_path)
+            if row is None:
+                return None
 
-            # 提取分类名称 - 保留原始官网分类
-            # 从 collection_path 提取，例如 '/collections/electric-bikes' -> 'Electric Bikes'
-            category_slug = collection_path.split('/')[-1]
-            category = self._format_category_name(category_slug)
+            product = Product(**row)
+            self._cache_product(product_url, product)
+            return product
 
-            # 提取标签
-            tags = product_data.get('tags', [])
-            if isinstance(tags, str):
-                tags = [t.strip() for t in tags.split(',')]
+        except Exception as e:
+            logger.error(f"Failed to parse product from JSON: {e}")
+            return None
 
-            # 创建默认选择器（将在运行时由 SelectorManager 更新）
-            selectors = Selectors()
+    def _product_url(self, product_data: Dict[str, Any]) -> str:
+        """根据 Shopify 商品 handle 构建商品 URL"""
+        return f"{self.base_url}/products/{product_data.get('handle', '')}"
 
-            product = Product(
-                id=product_id,
-                name=product_data.get('title', ''),
-                url=product_url,
-                category=category,
-                price_min=price_min,
-                price_max=price_max,
-                currency="USD",
-                variants=variants,
-                selectors=selectors,
-                priority="P1",
-                tags=tags,
-                metadata={
-                    'vendor': product_data.get('vendor', ''),
-                    'product_type': product_data.get('product_type', ''),
-                    'handle': handle,
-                    'available': product_data.get('available', False),
-                    'collection_path': collection_path,  # 保留原始分类路径
-                    'category_slug': category_slug  # 保留URL友好的分类名称
-                }
-            )
+    def _load_cached_product(self, product_url: str) -> Optional[Product]:
+        """从缓存加载商品，未启用缓存、未命中或缓存无效时返回 None"""
+        if not (self.use_cache and self.cache):
+            return None
 
-            # 保存到缓存
-            if self.use_cache and self.cache:
+        with self._cache_lock:
+            cached_data = self.cache.get(product_url)
+        if cached_data:
+            try:
+                return Product(**cached_data)
+            except Exception as e:
+                logger.warning(f"Failed to load from cache: {e}")
+        return None
+
+    def _cache_product(self, product_url: str, product: Product):
+        """保存商品到缓存"""
+        if self.use_cache and self.cache:
+            with self._cache_lock:
                 self.cache.set(product_url, product.model_dump(mode='json'))
 
-            return product
-
+    def _validate_product_row(self, row: Dict[str, Any]) -> Optional[Product]:
+        """逐个校验商品字段（批量校验失败时使用），无效时返回 None"""
+        try:
+            return Product(**row)
         except Exception as e:
             logger.error(f"Failed to parse product from JSON: {e}")
             return None
 
+    def _build_product_row(
+        self,
+        product_data: Dict[str, Any],
+        collection_path: str
+    ) -> Optional[Dict[str, Any]]:
+        """从 Shopify JSON 数据构造 Product 字段（尚未校验）
+
+        Args:
+            product_data: Shopify 产品 JSON 数据
+            collection_path: 所属分类路径
+
+        Returns:
+            Product 字段字典，商品没有有效价格时返回 None
+        """
+        handle = product_data.get('handle', '')
+
+        # 提取基本信息
+        product_id = str(product_data.get('id', ''))
+
+        # 提取价格范围
+        variants_data = product_data.get('variants', [])
+        prices = [float(v.get('price', 0)) for v in variants_data if v.get('price')]
+
+        if not prices:
+            logger.warning(f"Product {handle} has no valid prices, skipping")
+            return None
+
+        price_min = min(prices)
+        price_max = max(prices)
+
+        # 提取变体信息
+        variants = []
+        for variant_data in variants_data:
+            variant = self._parse_variant_from_json(variant_data)
+            if variant:
+                variants.append(variant)
+
+        # 提取分类名称 - 保留原始官网分类
+        # 从 collection_path 提取，例如 '/collections/electric-bikes' -> 'Electric Bikes'
+        category_slug = collection_path.split('/')[-1]
+        category = self._format_category_name(category_slug)
+
+        # 提取标签
+        tags = product_data.get('tags', [])
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(',')]
+
+        # 创建默认选择器（将在运行时由 SelectorManager 更新）
+        selectors = Selectors()
+
+        return {
+            'id': product_id,
+            'name': product_data.get('title', ''),
+            'url': self._product_url(product_data),
+            'category': category,
+            'price_min': price_min,
+            'price_max': price_max,
+            'currency': "USD",
+            'variants': variants,
+            'selectors': selectors,
+            'priority': "P1",
+            'tags': tags,
+            'metadata': {
+                'vendor': product_data.get('vendor', ''),
+                'product_type': product_data.get('product_type', ''),
+                'handle': handle,
+                'available': product_data.get('available', False),
+                'collection_path': collection_path,  # 保留原始分类路径
+                'category_slug': category_slug  # 保留URL友好的分类名称
+            }
+        }
+
     def _parse_variant_from_json(
         self,
         variant_data: Dict[str, Any]
@@ -483,18 +736,15 @@ class ProductCrawler:
         name_lower = variant_name.lower()
 
         # 颜色关键词
-        color_keywords = ['black', 'white', 'red', 'blue', 'green', 'yellow', 'gray', 'silver']
-        if any(keyword in name_lower for keyword in color_keywords):
+        if _COLOR_RE.search(name_lower):
             return 'color'
 
         # 尺寸关键词
-        size_keywords = ['small', 'medium', 'large', 'xs', 's', 'm', 'l', 'xl', 'xxl']
-        if any(keyword == name_lower or keyword in name_lower.split() for keyword in size_keywords):
+        if not _SIZE_WORDS.isdisjoint(name_lower.split()):
             return 'size'
 
         # 配置关键词
-        config_keywords = ['standard', 'pro', 'plus', 'premium', 'basic', 'advanced']
-        if any(keyword in name_lower for keyword in config_keywords):
+        if _CONFIG_RE.search(name_lower):
             return 'configuration'
 
         # 默认为样式
@@ -515,32 +765,25 @@ class ProductCrawler:
             Product 对象列表
         """
         collection_url = f"{self.base_url}{collection_path}"
-        response = self.session.get(collection_url, timeout=self.timeout)
+        response = self._get(collection_url)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        tree = self._parse_html(response.text)
         products = []
 
         # 查找商品链接（Shopify 常见模式）
-        product_selectors = [
-            '.product-item a[href*="/products/"]',
-            '.product-card a[href*="/products/"]',
-            '.grid-item a[href*="/products/"]',
-            'a.product-link[href*="/products/"]',
-            'a[href*="/products/"]'
-        ]
-
         product_links = set()
-        for selector in product_selectors:
-            for link in soup.select(selector):
-                href = link.get('href', '')
+        for selector in PRODUCT_LINK_SELECTORS:
+            for href in self._select_hrefs(tree, selector):
                 if '/products/' in href:
+                    # 移除查询参数和锚点（变体链接 ?variant=... 与商品页为同一商品）
+                    href = _STRIP_QS.sub('', href)
+
                     # 标准化 URL
                     if not href.startswith('http'):
                         href = urljoin(self.base_url, href)
 
-                    # 移除查询参数
-                    href = href.split('?')[0]
+                    # product_links 为集合，重复链接在此处 O(1) 去重
                     product_links.add(href)
 
                     if limit and len(product_links) >= limit:
@@ -558,7 +801,7 @@ class ProductCrawler:
                 break
 
             # 从 URL 提取 handle
-            handle = product_url.split('/products/')[-1].split('?')[0]
+            handle = product_url.split('/products/')[-1]
 
             # 创建基本商品对象（详细信息需要进一步抓取）
             product = Product(
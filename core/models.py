@@ -5,9 +5,9 @@
 """
 
 from datetime import datetime
-from typing import Dict, List, Literal, Optional
+from typing import Annotated, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, TypeAdapter
 
 
 class ProductVariant(BaseModel):
@@ -27,8 +27,8 @@ class ProductVariant(BaseModel):
         default=None, description="价格差异（相对于基础价格）"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Black",
                 "type": "color",
@@ -37,6 +37,7 @@ class ProductVariant(BaseModel):
                 "price_modifier": 0.0
             }
         }
+    )
 
 
 class Selectors(BaseModel):
@@ -63,9 +64,9 @@ class Selectors(BaseModel):
         description="变体选项选择器映射"
     )
 
-    class Config:
-        extra = "allow"  # 允许额外字段
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="allow",  # 允许额外字段
+        json_schema_extra={
             "example": {
                 "product_title": ".product__title",
                 "product_price": ".price",
@@ -76,6 +77,7 @@ class Selectors(BaseModel):
                 }
             }
         }
+    )
 
 
 class Product(BaseModel):
@@ -117,8 +119,8 @@ class Product(BaseModel):
         description="测试状态"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "fiido_d11",
                 "name": "FIIDO D11",
@@ -137,6 +139,7 @@ class Product(BaseModel):
                 "tags": ["electric-bike", "bestseller"]
             }
         }
+    )
 
 
 class TestResult(BaseModel):
@@ -151,7 +154,10 @@ class TestResult(BaseModel):
     status: Literal["passed", "failed", "skipped"] = Field(
         ..., description="测试状态"
     )
-    duration: float = Field(..., ge=0, description="测试执行时长（秒）")
+    # strict: 只接受数值，跳过字符串等类型的转换尝试
+    duration: Annotated[float, Field(ge=0, strict=True)] = Field(
+        ..., description="测试执行时长（秒）"
+    )
     error_message: Optional[str] = Field(
         default=None,
         description="错误信息（如果失败）"
@@ -165,8 +171,8 @@ class TestResult(BaseModel):
         description="测试执行时间"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "product_id": "fiido_d11",
                 "test_name": "test_product_page_loads",
@@ -177,6 +183,7 @@ class TestResult(BaseModel):
                 "timestamp": "2025-12-01T10:00:00"
             }
         }
+    )
 
 
 class TestSummary(BaseModel):
@@ -191,14 +198,17 @@ class TestSummary(BaseModel):
     failed: int = Field(..., ge=0, description="失败数")
     skipped: int = Field(..., ge=0, description="跳过数")
     duration: float = Field(..., ge=0, description="总执行时长（秒）")
-    pass_rate: float = Field(..., ge=0, le=100, description="通过率（百分比）")
+    # strict: 只接受数值，跳过字符串等类型的转换尝试
+    pass_rate: Annotated[float, Field(ge=0, le=100, strict=True)] = Field(
+        ..., description="通过率（百分比）"
+    )
     timestamp: datetime = Field(
         default_factory=datetime.now,
         description="测试执行时间"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "total": 100,
                 "passed": 95,
@@ -209,3 +219,8 @@ class TestSummary(BaseModel):
                 "timestamp": "2025-12-01T10:00:00"
             }
         }
+    )
+
+
+# 批量校验商品列表（一次调用校验整个列表，比逐个构造 Product 更快）
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[Product])
@@ -0,0 +1,147 @@
+"""
+商品优先级覆盖层
+
+scripts/update_product_priority.py 计算出的优先级默认只写入与商品文件
+同目录、以商品文件命名的覆盖层（如 products.priority_overlay.json，id → 优先级），
+商品文件本身保持不变。覆盖层记录生成时商品文件的修改时间和大小，商品文件
+之后被修改则视为过期、不再合并。读取商品数据的入口在加载商品文件后调用
+apply_priority_overlay 合并覆盖层。
+
+脚本还可以按优先级输出分片文件（如 products.P0.json），只按单个优先级
+运行测试时直接加载对应分片，省去读取和过滤整个商品文件。
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+try:
+    import orjson  # 可选依赖：更快的 JSON 编解码
+except ImportError:
+    orjson = None
+
+
+PRIORITY_OVERLAY_SUFFIX = ".priority_overlay.json"
+
+
+def get_overlay_path(products_file: Path) -> Path:
+    """获取商品文件对应的优先级覆盖层路径，如 data/products.priority_overlay.json"""
+    products_file = Path(products_file)
+    return products_file.with_name(f"{products_file.stem}{PRIORITY_OVERLAY_SUFFIX}")
+
+
+def _source_stamp(products_file: Path) -> Optional[dict]:
+    """商品文件的名称、修改时间和大小，用于判断覆盖层是否对应当前的商品文件"""
+    products_file = Path(products_file)
+    try:
+        stat = products_file.stat()
+    except FileNotFoundError:
+        return None
+    return {"file": products_file.name, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def get_priority_shard_path(products_file: Path, priority: str) -> Path:
+    """获取商品文件按优先级拆分后的分片路径，如 data/products.P0.json"""
+    products_file = Path(products_file)
+    return products_file.with_name(f"{products_file.stem}.{priority}{products_file.suffix}")
+
+
+def find_priority_shard(products_file: Path, priority: str) -> Optional[Path]:
+    """
+    查找可用的优先级分片
+
+    分片必须比商品文件和优先级覆盖层都新，否则说明分片生成后商品或
+    优先级已更新，视为过期。
+
+    Returns:
+        分片路径；不存在或已过期时返回 None
+    """
+    shard_file = get_priority_shard_path(products_file, priority)
+    if not shard_file.exists():
+        return None
+
+    shard_mtime = shard_file.stat().st_mtime
+    for source in (Path(products_file), get_overlay_path(products_file)):
+        if source.exists() and source.stat().st_mtime > shard_mtime:
+            return None
+    return shard_file
+
+
+def load_priority_overlay(products_file: Path) -> Dict[str, str]:
+    """
+    读取商品文件对应的优先级覆盖层
+
+    Args:
+        products_file: 商品数据文件路径
+
+    Returns:
+        商品 ID 到优先级的映射；覆盖层不存在或已过期（商品文件在覆盖层
+        生成后被修改）时返回空字典
+    """
+    overlay_file = get_overlay_path(products_file)
+    if not overlay_file.exists():
+        return {}
+
+    if orjson is not None:
+        data = orjson.loads(overlay_file.read_bytes())
+    else:
+        with open(overlay_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    source = _source_stamp(products_file)
+    if source is None or data.get("source") != source:
+        return {}
+    return data.get("priorities", {})
+
+
+def apply_priority_overlay(products: Iterable[dict], overlay: Dict[str, str]) -> int:
+    """
+    将覆盖层中的优先级写入商品字典（原地修改）
+
+    Args:
+        products: 商品字典列表
+        overlay: 商品 ID 到优先级的映射
+
+    Returns:
+        被覆盖优先级的商品数
+    """
+    if not overlay:
+        return 0
+
+    applied = 0
+    for product in products:
+        priority = overlay.get(product.get("id"))
+        if priority is not None:
+            product["priority"] = priority
+            applied += 1
+    return applied
+
+
+def save_priority_overlay(
+    products_file: Path,
+    priorities: Dict[str, str],
+    metadata: Optional[dict] = None
+) -> Path:
+    """
+    保存优先级覆盖层
+
+    同时记录商品文件当前的修改时间和大小，商品文件之后被修改时覆盖层失效，
+    因此需要在商品文件写完之后再保存覆盖层。
+
+    Args:
+        products_file: 商品数据文件路径（覆盖层写在同目录下）
+        priorities: 商品 ID 到优先级的映射
+        metadata: 附加的元数据（如更新时间、各优先级数量）
+
+    Returns:
+        覆盖层文件路径
+    """
+    overlay_file = get_overlay_path(products_file)
+    data = {**(metadata or {}), "source": _source_stamp(products_file), "priorities": priorities}
+
+    if orjson is not None:
+        overlay_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(overlay_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return overlay_file
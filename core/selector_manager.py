@@ -7,10 +7,19 @@
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, TextIO, Tuple
+
+try:
+    import orjson  # 可选依赖：更快的 JSON 解析
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# 已解析的配置文件缓存：绝对路径 → (文件 mtime_ns, 配置字典)
+# 每个 ProductPage 都会创建 SelectorManager，文件未修改时不再重复读取和解析
+_CONFIG_CACHE: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+
 
 class SelectorManager:
     """管理和解析选择器配置
@@ -43,14 +52,29 @@ class SelectorManager:
             logger.warning(f"Config file not found: {self.config_path}, using defaults")
             return self._get_default_config()
 
-        try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+        cache_key = self.config_path.resolve()
+        mtime_ns = self.config_path.stat().st_mtime_ns
+        cached = _CONFIG_CACHE.get(cache_key)
+
+        if cached is None or cached[0] != mtime_ns:
+            try:
+                if orjson is not None:
+                    # orjson 直接解析字节，省去 UTF-8 解码；其 JSONDecodeError 是 json.JSONDecodeError 的子类
+                    config = orjson.loads(self.config_path.read_bytes())
+                else:
+                    with open(self.config_path, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
                 logger.debug(f"Loaded selectors config: {len(config.get('base_selectors', {}))} base selectors")
-                return config
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON in config file: {e}")
-            raise
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON in config file: {e}")
+                raise
+            cached = _CONFIG_CACHE[cache_key] = (mtime_ns, config)
+
+        # update_selector 会修改实例的配置，复制到第二层，避免影响缓存和其他实例
+        return {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in cached[1].items()
+        }
 
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置
@@ -201,12 +225,17 @@ class SelectorManager:
         self.selectors[selector_type][key] = value
         logger.info(f"Updated selector: {selector_type}.{key} = {value}")
 
-    def save_config(self, output_path: Optional[str] = None):
+    def save_config(self, output_path: Optional[str] = None, stream: Optional[TextIO] = None):
         """保存配置到文件
 
         Args:
             output_path: 输出路径，默认为原配置文件路径
+            stream: 已打开的文本流（如 io.StringIO），提供时直接写入该流，忽略 output_path
         """
+        if stream is not None:
+            json.dump(self.selectors, stream, indent=2, ensure_ascii=False)
+            return
+
         save_path = Path(output_path) if output_path else self.config_path
         save_path.parent.mkdir(parents=True, exist_ok=True)
 
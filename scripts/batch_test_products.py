@@ -17,6 +17,7 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 from run_product_test import ProductTester
 from core.models import Product
+from core.priority_overlay import apply_priority_overlay, load_priority_overlay
 
 
 async def test_product(product_data, index, total, test_mode="quick"):
@@ -74,6 +75,7 @@ async def main():
         data = json.load(f)
 
     all_products = data.get("products", [])
+    apply_priority_overlay(all_products, load_priority_overlay(products_file))
     products_dict = {p['id']: p for p in all_products}  # 用于快速查找
 
     # 判断测试模式：自定义多选 vs 过滤模式
@@ -145,43 +145,42 @@ def discover_products_from_collections(
     duplicate_count = 0
     existing_products = existing_products or {}
 
-    for i, collection_path in enumerate(collection_paths, 1):
-        logger.info(f"[{i}/{len(collection_paths)}] Processing collection: {collection_path}")
-
-        try:
-            products = crawler.discover_products(collection_path, limit=limit_per_collection)
-
-            for product in products:
-                # 去重检查：如果商品ID已存在，跳过
-                if product.id in products_dict:
-                    duplicate_count += 1
-                    logger.debug(f"  Skipping duplicate product: {product.name} (ID: {product.id})")
-                    continue
-
-                # 检查是新商品还是更新
-                if product.id in existing_products:
-                    # 更新已存在的商品
-                    existing_product = existing_products[product.id]
-                    # 保留原有的测试状态和最后测试时间
-                    if 'test_status' in existing_product:
-                        product.test_status = existing_product['test_status']
-                    if 'last_tested' in existing_product and existing_product['last_tested']:
-                        # 不覆盖 last_tested，保持原值
-                        pass
-                    updated_count += 1
-                else:
-                    # 新商品
-                    new_count += 1
-
-                # 添加到去重字典
-                products_dict[product.id] = product
-
-            logger.info(f"  Found {len(products)} products in {collection_path}")
-
-        except Exception as e:
-            logger.error(f"  Failed to process {collection_path}: {e}")
+    # 各分类并发抓取（单个分类失败时结果为 None），按分类顺序合并以保持去重结果稳定
+    logger.info(f"Processing {len(collection_paths)} collections")
+    results = crawler.discover_all(collection_paths, limit=limit_per_collection)
+
+    for i, (collection_path, products) in enumerate(zip(collection_paths, results), 1):
+        if products is None:
+            logger.error(f"  [{i}/{len(collection_paths)}] Failed to process {collection_path}")
             continue
 
+        for product in products:
+            # 去重检查：如果商品ID已存在，跳过
+            if product.id in products_dict:
+                duplicate_count += 1
+                logger.debug(f"  Skipping duplicate product: {product.name} (ID: {product.id})")
+                continue
+
+            # 检查是新商品还是更新
+            if product.id in existing_products:
+                # 更新已存在的商品
+                existing_product = existing_products[product.id]
+                # 保留原有的测试状态和最后测试时间
+                if 'test_status' in existing_product:
+                    product.test_status = existing_product['test_status']
+                if 'last_tested' in existing_product and existing_product['last_tested']:
+                    # 不覆盖 last_tested，保持原值
+                    pass
+                updated_count += 1
+            else:
+                # 新商品
+                new_count += 1
+
+            # 添加到去重字典
+            products_dict[product.id] = product
+
+        logger.info(f"  [{i}/{len(collection_paths)}] Found {len(products)} products in {collection_path}")
+
     # 转换为列表
     all_products = list(products_dict.values())
 
@@ -20,10 +20,16 @@ from typing import Dict, List, Optional
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from playwright.async_api import async_playwright, Browser, Page
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 from core.models import Product
+from core.priority_overlay import apply_priority_overlay, load_priority_overlay
 from pages.product_page import ProductPage
 
+try:
+    import orjson  # 可选依赖：更快的 JSON 解析
+except ImportError:
+    orjson = None
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(message)s',
@@ -31,6 +37,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 浏览器会话状态缓存（cookie/localStorage），用于跨次运行复用 Shopify 会话
+STORAGE_STATE_FILE = PROJECT_ROOT / ".cache" / "fiido_state.json"
+STORAGE_STATE_TTL = 30 * 60  # 30分钟，避免复用过期的购物车会话
+# Shopify 购物车 cookie，不写入会话状态，避免多次运行共用同一个服务端购物车
+CART_COOKIE_NAMES = ("cart", "cart_sig", "cart_ts")
+
+# 第三方统计/追踪脚本域名，与购物流程无关，拦截后可减少页面加载和JS执行耗时
+BLOCKED_TRACKER_DOMAINS = (
+    "google-analytics",
+    "googletagmanager",
+    "doubleclick",
+    "facebook.net",
+    "hotjar",
+    "klaviyo",
+    "segment.io",
+)
+# 显式开启 block_media 时额外拦截的资源类型（会影响懒加载图片、布局和依赖字体的可见性判断）
+BLOCKED_MEDIA_RESOURCE_TYPES = ("image", "media", "font")
+
+
+def load_products_data(products_file: Path) -> Dict:
+    """
+    读取商品数据文件（data/products.json）
+
+    优先使用 orjson 直接解析字节内容，未安装时回退到标准库 json，
+    两者返回的 dict/list 结构完全一致。读取后合并同目录下的优先级覆盖层。
+    """
+    if orjson is not None:
+        data = orjson.loads(products_file.read_bytes())
+    else:
+        with open(products_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+    apply_priority_overlay(data.get("products", []), load_priority_overlay(products_file))
+    return data
+
 
 def analyze_js_error_root_cause(js_errors: List[str]) -> str:
     """
@@ -174,6 +216,80 @@ def analyze_js_error_root_cause(js_errors: List[str]) -> str:
     )
 
 
+class AsyncConsole:
+    """
+    异步控制台输出
+
+    print 的内容先放入 asyncio.Queue，由单个写入任务取出已排队的全部内容，
+    在线程中合并写入 stdout，阻塞的 stdout 写入不占用事件循环。
+    未调用 start() 时直接写 stdout。使用方需在 finally 中调用 close()，
+    保证异常退出时排队的内容也能写出。
+    """
+
+    def __init__(self):
+        self.queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """在事件循环中启动写入任务"""
+        self.queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer())
+
+    def print(self, *args, sep: str = " ", end: str = "\n"):
+        """与内置 print 相同的用法，非阻塞"""
+        text = sep.join(str(arg) for arg in args) + end
+        if self.queue is None:
+            sys.stdout.write(text)
+        else:
+            self.queue.put_nowait(text)
+
+    async def flush(self):
+        """等待已排队的内容全部写出（写入任务已结束时不再等待，避免挂起）"""
+        if self.queue is not None and self._writer_running():
+            await self.queue.join()
+
+    async def close(self):
+        """写出剩余内容并停止写入任务"""
+        if self._writer_task is None:
+            return
+        if self._writer_running():
+            await self.queue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self.queue = None
+        self._writer_task = None
+
+    def _writer_running(self) -> bool:
+        return self._writer_task is not None and not self._writer_task.done()
+
+    @staticmethod
+    def _write(text: str):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    async def _writer(self):
+        while True:
+            texts = [await self.queue.get()]
+            while not self.queue.empty():
+                texts.append(self.queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write, "".join(texts))
+            except Exception as e:
+                # stdout 已关闭或编码失败时丢弃这批内容，写入任务继续运行，flush()/close() 不会挂起
+                logger.error(f"控制台输出写入失败: {e}")
+            finally:
+                for _ in texts:
+                    self.queue.task_done()
+
+
+def index_steps(steps: List[Dict]) -> Dict[int, Dict]:
+    """按步骤编号建立索引，便于 O(1) 查找指定步骤"""
+    return {step["number"]: step for step in steps}
+
+
 class TestStep:
     """测试步骤记录"""
 
@@ -260,12 +376,18 @@ class TestStep:
 class ProductTester:
     """商品测试执行器"""
 
-    def __init__(self, product: Product, test_mode: str = "quick", headless: bool = True):
+    def __init__(self, product: Product, test_mode: str = "quick", headless: bool = True,
+                 reuse_session: bool = False, block_third_party: bool = False,
+                 block_media: bool = False):
         self.product = product
         self.test_mode = test_mode  # quick 或 full
         self.headless = headless
+        self.reuse_session = reuse_session  # 是否复用磁盘上缓存的会话状态
+        self.block_third_party = block_third_party  # 是否拦截第三方追踪请求
+        self.block_media = block_media  # 是否拦截图片/媒体/字体请求（默认关闭）
         self.steps: List[TestStep] = []
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.product_page: Optional[ProductPage] = None
         self.start_time: float = 0
@@ -353,6 +475,7 @@ class ProductTester:
         self.end_time = time.time()
         result["duration"] = round(self.end_time - self.start_time, 2)
         result["steps"] = [step.to_dict() for step in self.steps]
+        result["_steps_by_num"] = index_steps(result["steps"])
 
         # 汇总结果
         passed_count = sum(1 for step in self.steps if step.status == "passed")
@@ -380,7 +503,14 @@ class ProductTester:
             headless=self.headless,
             timeout=60000  # 60秒浏览器启动超时
         )
-        self.page = await self.browser.new_page()
+        storage_state = None
+        if self.reuse_session and self._storage_state_is_fresh():
+            storage_state = str(STORAGE_STATE_FILE)
+            logger.info(f"复用缓存的会话状态: {STORAGE_STATE_FILE}")
+        self.context = await self.browser.new_context(storage_state=storage_state)
+        if self.block_third_party or self.block_media:
+            await self.context.route("**/*", self._route_request)
+        self.page = await self.context.new_page()
         # 设置页面默认超时为60秒
         self.page.set_default_timeout(60000)
 
@@ -394,6 +524,45 @@ class ProductTester:
 
         self.page.on("console", on_console)
 
+    async def _route_request(self, route):
+        """拦截第三方追踪请求；开启 block_media 时同时拦截图片/媒体/字体资源"""
+        request = route.request
+        if self.block_third_party and any(domain in request.url for domain in BLOCKED_TRACKER_DOMAINS):
+            await route.abort()
+        elif self.block_media and request.resource_type in BLOCKED_MEDIA_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @staticmethod
+    def _storage_state_is_fresh() -> bool:
+        """会话状态文件是否存在且未超过 TTL"""
+        try:
+            age = time.time() - STORAGE_STATE_FILE.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return age < STORAGE_STATE_TTL
+
+    async def _save_storage_state(self):
+        """
+        首次访问页面后保存会话状态，供后续运行复用
+
+        购物车 cookie（CART_COOKIE_NAMES）不保存：Shopify 访问页面时就可能分配购物车，
+        保存后下一次运行会复用同一个服务端购物车，看到本次测试加入的商品。
+        """
+        if not self.reuse_session or not self.context or self._storage_state_is_fresh():
+            return
+        try:
+            state = await self.context.storage_state()
+            state["cookies"] = [
+                cookie for cookie in state.get("cookies", [])
+                if cookie.get("name") not in CART_COOKIE_NAMES
+            ]
+            STORAGE_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            STORAGE_STATE_FILE.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+        except Exception as e:
+            logger.warning(f"保存会话状态失败: {e}")
+
     async def _cleanup(self):
         """清理环境"""
         if self.browser:
@@ -410,6 +579,7 @@ class ProductTester:
             await self.product_page.navigate(wait_until="domcontentloaded")
             # 等待页面稳定
             await self.page.wait_for_timeout(3000)
+            await self._save_storage_state()
             step.complete("passed", f"成功访问页面: {self.page.url}")
         except Exception as e:
             step.complete("failed", "页面访问失败", str(e))
@@ -807,6 +977,7 @@ class ProductTester:
             self.product_page = ProductPage(self.page, self.product)
             await self.product_page.navigate(wait_until="domcontentloaded")  # 使用domcontentloaded更快
             await self.page.wait_for_timeout(3000)  # 等待3秒让页面完全加载
+            await self._save_storage_state()
             step.complete("passed", f"页面加载完成: {self.page.url}")
         except Exception as e:
             step.complete("failed", "页面访问失败", str(e))
@@ -1576,8 +1747,7 @@ async def main():
         logger.error(f"商品数据文件不存在: {products_file}")
         sys.exit(1)
 
-    with open(products_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_products_data(products_file)
 
     products_list = data.get("products", [])
     product_data = next((p for p in products_list if p["id"] == args.product_id), None)
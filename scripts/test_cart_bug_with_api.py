@@ -11,6 +11,41 @@ from playwright.async_api import async_playwright
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+# 从购物车商品行读取行项目标识（Shopify 主题常见的 data 属性），
+# 用于在 /cart/change 响应中找到被点击的那一行
+LINE_ITEM_ID_SCRIPT = """
+el => {
+    const attrs = {
+        key: ['data-key', 'data-line-item-key', 'data-cart-item-key'],
+        variant_id: ['data-variant-id', 'data-quantity-variant-id', 'data-variant']
+    };
+    const result = {};
+    for (const [field, names] of Object.entries(attrs)) {
+        const selector = names.map(name => '[' + name + ']').join(',');
+        const holder = el.matches(selector) ? el : el.querySelector(selector);
+        if (holder) {
+            const name = names.find(n => holder.hasAttribute(n));
+            result[field] = holder.getAttribute(name);
+        }
+    }
+    return result;
+}
+"""
+
+
+def find_line_item(items, line_item_id):
+    """按 key 或 variant_id 在购物车响应中查找行项目；无法识别时只在购物车仅一行时返回该行"""
+    key = line_item_id.get("key")
+    variant_id = line_item_id.get("variant_id")
+    for item in items:
+        if key and item.get("key") == key:
+            return item
+        if variant_id and str(item.get("variant_id")) == variant_id:
+            return item
+    if not key and not variant_id and len(items) == 1:
+        return items[0]
+    return None
+
 
 async def test_cart_bug_with_api():
     """使用Shopify Cart API添加商品后测试购物车Bug"""
@@ -165,11 +200,13 @@ async def test_cart_bug_with_api():
 
         # 使用第一个商品进行测试(跳过可能的表头)
         test_item = None
+        test_item_buttons = []
         for i, item in enumerate(cart_items):
             # 检查是否包含button/a元素
             buttons = await item.query_selector_all("button, a")
             if len(buttons) > 0:
                 test_item = item
+                test_item_buttons = buttons
                 print(f"使用第{i+1}个元素作为商品行(包含{len(buttons)}个button/a)")
                 break
 
@@ -179,13 +216,13 @@ async def test_cart_bug_with_api():
             await browser.close()
             return
 
-        #使用test_item而不是first_item
-        first_item = test_item
-
-        # 在商品行内查找所有button和a元素
-        buttons_in_item = await first_item.query_selector_all("button, a")
+        # 商品行内的button和a元素在上面扫描时已查到，扫描后页面未发生操作，直接复用
+        buttons_in_item = test_item_buttons
         print(f"该商品行内找到 {len(buttons_in_item)} 个button/a元素")
 
+        line_item_id = await test_item.evaluate(LINE_ITEM_ID_SCRIPT)
+        print(f"商品行标识: {line_item_id or '未找到'}")
+
         # 打印每个button的内容
         plus_btn = None
         for i, btn in enumerate(buttons_in_item):
@@ -232,10 +269,29 @@ async def test_cart_bug_with_api():
         await page.screenshot(path="before_click.png")
         print("已截图(点击前): before_click.png")
 
+        # 点击前开始监听购物车更新请求,直接读取服务端返回的数量
+        cart_response_task = asyncio.create_task(page.wait_for_response(
+            lambda r: "/cart/change" in r.url or "/cart/update" in r.url,
+            timeout=5000
+        ))
+
         try:
             # 🎯 核心测试: 点击加号按钮
             print("🖱️  点击加号按钮...")
             await plus_btn.click(timeout=3000)
+
+            server_qty = None
+            try:
+                cart_response = await cart_response_task
+                cart = await cart_response.json()
+                clicked_item = find_line_item(cart.get("items") or [], line_item_id)
+                if clicked_item is not None:
+                    server_qty = clicked_item.get("quantity")
+                else:
+                    print("⚠️  购物车更新响应中未找到被点击的商品行")
+            except Exception as e:
+                print(f"⚠️  未捕获到购物车更新响应: {e}")
+
             await page.wait_for_timeout(2000)
 
             # 📸 点击后截图
@@ -247,10 +303,19 @@ async def test_cart_bug_with_api():
             new_console_errors = console_errors[console_errors_before:]
 
             # 🔍 检查数量是否变化
-            # 方法1: 如果有input,检查value
-            if qty_input:
-                new_qty = await qty_input.get_attribute("value")
-                print(f"点击后数量(从input): {new_qty}")
+            # 方法1: 优先使用服务端响应中的数量,其次检查input的value
+            if server_qty is not None or qty_input:
+                if server_qty is not None:
+                    new_qty = str(server_qty)
+                    print(f"点击后数量(从购物车API响应): {new_qty}")
+
+                    if qty_input:
+                        ui_qty = await qty_input.get_attribute("value")
+                        if ui_qty != new_qty:
+                            print(f"❌ 检测到Bug: 服务端数量为 {new_qty},但页面显示 {ui_qty}")
+                else:
+                    new_qty = await qty_input.get_attribute("value")
+                    print(f"点击后数量(从input): {new_qty}")
 
                 if qty_text and int(new_qty) > int(qty_text):
                     print("✅ 数量增加成功 - 功能正常!")
@@ -292,6 +357,7 @@ async def test_cart_bug_with_api():
                     print("\n无JavaScript错误")
 
         except Exception as e:
+            cart_response_task.cancel()
             print(f"❌ 点击失败: {e}")
             await page.screenshot(path="click_error.png")
             print("已截图保存: click_error.png")
@@ -40,9 +40,17 @@ from dataclasses import dataclass, field
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from run_product_test import ProductTester
+from run_product_test import AsyncConsole, ProductTester, load_products_data
 from core.models import Product
 
+try:
+    import orjson  # 可选依赖：更快的 JSON 序列化
+except ImportError:
+    orjson = None
+
+# 脚本输出通过队列异步写出，见 AsyncConsole
+console = AsyncConsole()
+
 
 @dataclass
 class StepCoverageResult:
@@ -72,13 +80,13 @@ class TestCaseResult:
     duration: float
     steps: List[Dict]
     category: str = ""
+    steps_by_num: Dict[int, Dict] = field(default_factory=dict)
 
 
 def load_test_products() -> List[Dict]:
     """加载测试商品，选择不同类型以覆盖各种场景"""
     products_file = PROJECT_ROOT / "data" / "products.json"
-    with open(products_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_products_data(products_file)
 
     all_products = [p for p in data.get("products", []) if '#' not in str(p.get('id', ''))]
 
@@ -121,15 +129,18 @@ def load_test_products() -> List[Dict]:
 
 async def run_single_test(product_data: Dict, test_mode: str) -> TestCaseResult:
     """运行单个商品测试"""
-    print(f"  🔄 测试: {product_data['name'][:50]}... ({test_mode})")
+    console.print(f"  🔄 测试: {product_data['name'][:50]}... ({test_mode})")
 
     try:
         product = Product(**product_data)
-        tester = ProductTester(product, test_mode=test_mode, headless=True)
+        # ProductTester 的日志直接写 stdout，先写出已排队内容以保持输出顺序
+        await console.flush()
+        tester = ProductTester(product, test_mode=test_mode, headless=True, reuse_session=True,
+                               block_third_party=True)
         result = await tester.run()
 
         status_icon = "✓" if result['status'] == 'passed' else "✗"
-        print(f"    {status_icon} {result['status'].upper()} ({result['duration']:.1f}s)")
+        console.print(f"    {status_icon} {result['status'].upper()} ({result['duration']:.1f}s)")
 
         return TestCaseResult(
             product_id=str(product_data['id']),
@@ -138,11 +149,12 @@ async def run_single_test(product_data: Dict, test_mode: str) -> TestCaseResult:
             status=result['status'],
             duration=result['duration'],
             steps=result['steps'],
-            category=product_data.get('category', '')
+            category=product_data.get('category', ''),
+            steps_by_num=result['_steps_by_num']
         )
 
     except Exception as e:
-        print(f"    ✗ ERROR: {str(e)[:50]}")
+        console.print(f"    ✗ ERROR: {str(e)[:50]}")
         return TestCaseResult(
             product_id=str(product_data['id']),
             product_name=product_data['name'],
@@ -192,8 +204,7 @@ def analyze_step_coverage(results: List[TestCaseResult], test_mode: str) -> Dict
         if result.test_mode != test_mode:
             continue
 
-        for step in result.steps:
-            step_num = step.get('number', 0)
+        for step_num, step in result.steps_by_num.items():
             if step_num not in coverage:
                 continue
 
@@ -222,40 +233,58 @@ def print_coverage_report(coverage: Dict[int, StepCoverageResult], test_mode: st
     """打印覆盖率报告"""
     mode_name = "快速测试" if test_mode == 'quick' else "全面测试"
 
-    print(f"\n{'='*70}")
-    print(f"📊 {mode_name} 步骤覆盖率报告")
-    print('='*70)
+    console.print(f"\n{'='*70}")
+    console.print(f"📊 {mode_name} 步骤覆盖率报告")
+    console.print('='*70)
 
-    print(f"\n{'步骤':<6} {'名称':<20} {'总数':<6} {'通过':<6} {'失败':<6} {'跳过':<6} {'通过率':<10}")
-    print('-'*70)
+    console.print(f"\n{'步骤':<6} {'名称':<20} {'总数':<6} {'通过':<6} {'失败':<6} {'跳过':<6} {'通过率':<10}")
+    console.print('-'*70)
 
+    rows = []
     for step_num in sorted(coverage.keys()):
         step = coverage[step_num]
-        pass_rate_str = f"{step.pass_rate:.1f}%"
+        pass_rate = step.pass_rate
+        pass_rate_str = f"{pass_rate:.1f}%"
 
         # 根据通过率设置颜色提示
-        if step.pass_rate >= 90:
+        if pass_rate >= 90:
             status_icon = "✅"
-        elif step.pass_rate >= 70:
+        elif pass_rate >= 70:
             status_icon = "⚠️"
         else:
             status_icon = "❌"
 
-        print(f"{step_num:<6} {step.step_name:<20} {step.total_tests:<6} {step.passed:<6} {step.failed:<6} {step.skipped:<6} {status_icon} {pass_rate_str:<10}")
+        rows.append(f"{step_num:<6} {step.step_name:<20} {step.total_tests:<6} {step.passed:<6} {step.failed:<6} {step.skipped:<6} {status_icon} {pass_rate_str:<10}")
+
+    # 一次性输出所有行
+    if rows:
+        console.print("\n".join(rows))
 
     # 打印失败详情
     failed_steps = [s for s in coverage.values() if s.failed > 0]
     if failed_steps:
-        print(f"\n{'='*70}")
-        print("❌ 失败步骤详情")
-        print('='*70)
+        console.print(f"\n{'='*70}")
+        console.print("❌ 失败步骤详情")
+        console.print('='*70)
 
         for step in failed_steps:
-            print(f"\n步骤 {step.step_number}: {step.step_name} (失败 {step.failed} 次)")
+            console.print(f"\n步骤 {step.step_number}: {step.step_name} (失败 {step.failed} 次)")
             for i, reason in enumerate(step.failure_reasons[:5], 1):
-                print(f"  {i}. {reason}")
+                console.print(f"  {i}. {reason}")
             if len(step.failure_reasons) > 5:
-                print(f"  ... 还有 {len(step.failure_reasons) - 5} 个失败")
+                console.print(f"  ... 还有 {len(step.failure_reasons) - 5} 个失败")
+
+
+def result_to_dict(r: TestCaseResult) -> Dict:
+    """将单个测试用例结果转换为报告字典（steps 直接引用，不复制）"""
+    return {
+        'product_id': r.product_id,
+        'product_name': r.product_name,
+        'category': r.category,
+        'status': r.status,
+        'duration': r.duration,
+        'steps': r.steps
+    }
 
 
 def generate_summary_report(
@@ -297,62 +326,59 @@ def generate_summary_report(
         'quick_test': {
             'summary': calc_stats(quick_results),
             'step_coverage': coverage_to_dict(quick_coverage),
-            'results': [
-                {
-                    'product_id': r.product_id,
-                    'product_name': r.product_name,
-                    'category': r.category,
-                    'status': r.status,
-                    'duration': r.duration,
-                    'steps': r.steps
-                }
-                for r in quick_results
-            ]
+            'results': list(map(result_to_dict, quick_results))
         },
         'full_test': {
             'summary': calc_stats(full_results),
             'step_coverage': coverage_to_dict(full_coverage),
-            'results': [
-                {
-                    'product_id': r.product_id,
-                    'product_name': r.product_name,
-                    'category': r.category,
-                    'status': r.status,
-                    'duration': r.duration,
-                    'steps': r.steps
-                }
-                for r in full_results
-            ]
+            'results': list(map(result_to_dict, full_results))
         }
     }
 
     return report
 
 
-async def main():
-    """主函数"""
-    print("\n" + "="*70)
-    print("🧪 测试步骤覆盖验证")
-    print("="*70)
-    print("目的：验证快速测试和全面测试的每个步骤是否能正确识别通过/失败")
-    print("="*70)
+def save_report(report: Dict, report_file: Path):
+    """
+    保存 JSON 报告
+
+    优先使用 orjson 直接写出 UTF-8 字节（步骤编号为 int 键，需要 OPT_NON_STR_KEYS），
+    未安装时回退到标准库 json。
+    """
+    if orjson is not None:
+        report_file.write_bytes(
+            orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+        return
+
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+async def _main():
+    """执行测试并输出结果"""
+    console.print("\n" + "="*70)
+    console.print("🧪 测试步骤覆盖验证")
+    console.print("="*70)
+    console.print("目的：验证快速测试和全面测试的每个步骤是否能正确识别通过/失败")
+    console.print("="*70)
 
     # 加载测试商品
     test_products = load_test_products()
-    print(f"\n📦 已选择 {len(test_products)} 个测试商品:")
+    console.print(f"\n📦 已选择 {len(test_products)} 个测试商品:")
     for i, p in enumerate(test_products, 1):
         priority = p.get('priority', 'P2')
         variants = len(p.get('variants', []))
-        print(f"  {i}. [{priority}] {p['name'][:50]} (变体: {variants})")
+        console.print(f"  {i}. [{priority}] {p['name'][:50]} (变体: {variants})")
 
     # ==================== 快速测试 ====================
-    print(f"\n{'='*70}")
-    print("⚡ 运行快速测试 (5步)")
-    print('='*70)
+    console.print(f"\n{'='*70}")
+    console.print("⚡ 运行快速测试 (5步)")
+    console.print('='*70)
 
     quick_results = []
     for i, product in enumerate(test_products, 1):
-        print(f"\n[{i}/{len(test_products)}]", end="")
+        console.print(f"\n[{i}/{len(test_products)}]", end="")
         result = await run_single_test(product, 'quick')
         quick_results.append(result)
 
@@ -360,13 +386,13 @@ async def main():
     print_coverage_report(quick_coverage, 'quick')
 
     # ==================== 全面测试 ====================
-    print(f"\n{'='*70}")
-    print("🔍 运行全面测试 (12步)")
-    print('='*70)
+    console.print(f"\n{'='*70}")
+    console.print("🔍 运行全面测试 (12步)")
+    console.print('='*70)
 
     full_results = []
     for i, product in enumerate(test_products, 1):
-        print(f"\n[{i}/{len(test_products)}]", end="")
+        console.print(f"\n[{i}/{len(test_products)}]", end="")
         result = await run_single_test(product, 'full')
         full_results.append(result)
 
@@ -374,29 +400,29 @@ async def main():
     print_coverage_report(full_coverage, 'full')
 
     # ==================== 汇总 ====================
-    print(f"\n{'='*70}")
-    print("📋 测试汇总")
-    print('='*70)
+    console.print(f"\n{'='*70}")
+    console.print("📋 测试汇总")
+    console.print('='*70)
 
     quick_passed = sum(1 for r in quick_results if r.status == 'passed')
     quick_failed = sum(1 for r in quick_results if r.status == 'failed')
     full_passed = sum(1 for r in full_results if r.status == 'passed')
     full_failed = sum(1 for r in full_results if r.status == 'failed')
 
-    print(f"\n快速测试: 通过 {quick_passed}/{len(quick_results)}, 失败 {quick_failed}")
-    print(f"全面测试: 通过 {full_passed}/{len(full_results)}, 失败 {full_failed}")
+    console.print(f"\n快速测试: 通过 {quick_passed}/{len(quick_results)}, 失败 {quick_failed}")
+    console.print(f"全面测试: 通过 {full_passed}/{len(full_results)}, 失败 {full_failed}")
 
     # 计算平均步骤通过率
     quick_avg_pass = sum(s.pass_rate for s in quick_coverage.values()) / len(quick_coverage) if quick_coverage else 0
     full_avg_pass = sum(s.pass_rate for s in full_coverage.values()) / len(full_coverage) if full_coverage else 0
 
-    print(f"\n快速测试平均步骤通过率: {quick_avg_pass:.1f}%")
-    print(f"全面测试平均步骤通过率: {full_avg_pass:.1f}%")
+    console.print(f"\n快速测试平均步骤通过率: {quick_avg_pass:.1f}%")
+    console.print(f"全面测试平均步骤通过率: {full_avg_pass:.1f}%")
 
     # 识别问题步骤
-    print(f"\n{'='*70}")
-    print("🔍 问题步骤分析")
-    print('='*70)
+    console.print(f"\n{'='*70}")
+    console.print("🔍 问题步骤分析")
+    console.print('='*70)
 
     problem_steps = []
     for mode, coverage in [('快速', quick_coverage), ('全面', full_coverage)]:
@@ -406,38 +432,46 @@ async def main():
 
     if problem_steps:
         for mode, step in problem_steps:
-            print(f"\n⚠️ [{mode}测试] 步骤 {step.step_number}: {step.step_name}")
-            print(f"   通过率: {step.pass_rate:.1f}% (通过 {step.passed}, 失败 {step.failed}, 跳过 {step.skipped})")
+            console.print(f"\n⚠️ [{mode}测试] 步骤 {step.step_number}: {step.step_name}")
+            console.print(f"   通过率: {step.pass_rate:.1f}% (通过 {step.passed}, 失败 {step.failed}, 跳过 {step.skipped})")
             if step.failure_reasons:
-                print("   失败原因示例:")
+                console.print("   失败原因示例:")
                 for reason in step.failure_reasons[:2]:
-                    print(f"   - {reason[:80]}")
+                    console.print(f"   - {reason[:80]}")
     else:
-        print("✅ 所有步骤通过率均 >= 80%")
+        console.print("✅ 所有步骤通过率均 >= 80%")
 
     # 保存详细报告
     report = generate_summary_report(quick_results, full_results, quick_coverage, full_coverage)
 
     report_file = PROJECT_ROOT / "reports" / f"step_coverage_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     report_file.parent.mkdir(exist_ok=True)
+    save_report(report, report_file)
 
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(report, f, ensure_ascii=False, indent=2)
-
-    print(f"\n📄 详细报告已保存: {report_file}")
+    console.print(f"\n📄 详细报告已保存: {report_file}")
 
     # 返回结论
-    print(f"\n{'='*70}")
-    print("💡 结论")
-    print('='*70)
+    console.print(f"\n{'='*70}")
+    console.print("💡 结论")
+    console.print('='*70)
 
     if quick_avg_pass >= 80 and full_avg_pass >= 80:
-        print("✅ 测试系统整体表现良好，各步骤能正确识别通过/失败情况")
+        console.print("✅ 测试系统整体表现良好，各步骤能正确识别通过/失败情况")
     else:
-        print("⚠️ 部分步骤通过率较低，需要进一步分析:")
-        print("  - 可能是测试逻辑问题（选择器过时、超时时间不足）")
-        print("  - 可能是网站真实存在的Bug")
-        print("  - 可能是功能缺失（某些商品页面没有该功能）")
+        console.print("⚠️ 部分步骤通过率较低，需要进一步分析:")
+        console.print("  - 可能是测试逻辑问题（选择器过时、超时时间不足）")
+        console.print("  - 可能是网站真实存在的Bug")
+        console.print("  - 可能是功能缺失（某些商品页面没有该功能）")
+
+
+async def main():
+    """主函数"""
+    console.start()
+    try:
+        await _main()
+    finally:
+        # 异常退出时也写出已排队的输出
+        await console.close()
 
 
 if __name__ == "__main__":
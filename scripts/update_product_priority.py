@@ -13,78 +13,364 @@
 3. 其他配件属于常规维护/升级需求
 """
 
+import argparse
+import importlib
 import json
+import os
+import re
 import sys
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from core.priority_overlay import get_priority_shard_path, save_priority_overlay
+
+# ========== 分类关键词 ==========
+# 整车型号关键词 - 必须是完整的车辆描述
+BIKE_PATTERNS = (
+    'electric bike', 'e-bike', 'electric scooter',
+    'folding bike', 'city bike', 'commuter bike', 'cargo bike',
+    'fat tire bike', 'gravel bike', 'touring bike', 'utility bike',
+    'mountain bike', 'mini bike', 'hybrid bike', 'e-gravel'
+)
+
+# 配件关键词（用于排除 - 如果包含这些则不是整车）
+ACCESSORY_KEYWORDS = (
+    'battery', 'charger', 'motor', 'display', 'brake', 'chain',
+    'tube', 'rack', 'seat', 'saddle', 'pedal', 'tire', 'wheel',
+    'lock', 'key', 'cover', 'fender', 'light', 'bell', 'mirror',
+    'bag', 'basket', 'controller', 'throttle', 'cable', 'grip',
+    'kickstand', 'mudguard', 'horn', 'reflector', 'pannier',
+    'inner', 'outer', 'disc', 'rotor', 'lever', 'pad', 'shell',
+    'handlebar', 'stem', 'fork', 'frame', 'hub', 'spoke', 'rim',
+    'accelerator', 'sensor', ' for ', '-for-', 'strip', 'port',
+    'switch', 'rails', 'extender', 'combo', 'trailer', 'bushing',
+    'spring', 'clamp', 'cage', 'bottle', 'holder', 'hanger',
+    'derailleur', 'crank', 'crankset', 'freewheel', 'headset',
+    'hook', 'quick release', 'handlepost', 'seatpost', 'booster'
+)
+
+# 配件关键词在商品ID（URL handle）中的写法：空格替换为连字符
+ACCESSORY_ID_KEYWORDS = tuple(ak.replace(' ', '-') for ak in ACCESSORY_KEYWORDS)
+
+# 配件类分类（如果在这些分类中，一定不是整车）
+ACCESSORY_CATEGORIES = ('accessories', 'replacement parts', 'batteries chargers')
+
+# 核心配件关键词 (电池/充电器/电机)
+CORE_PART_KEYWORDS = ('battery', 'charger', 'motor')
+
+# 电池配件关键词（如电池锁、电池盖，用于排除电池本身）
+BATTERY_ACCESSORY_KEYWORDS = ('lock', 'cover', 'shell', 'base', 'rails', 'switch', 'port', 'strip', 'bag', 'rack')
+
+# 商品名称关键词分组的位标记
+KW_BIKE = 1 << 0
+KW_ACCESSORY = 1 << 1
+KW_CORE_PART = 1 << 2
+KW_BATTERY_ACCESSORY = 1 << 3
+
+NAME_KEYWORD_GROUPS = (
+    (KW_BIKE, BIKE_PATTERNS),
+    (KW_ACCESSORY, ACCESSORY_KEYWORDS),
+    (KW_CORE_PART, CORE_PART_KEYWORDS),
+    (KW_BATTERY_ACCESSORY, BATTERY_ACCESSORY_KEYWORDS),
+)
+
+
+def _compile_keywords(keywords) -> re.Pattern:
+    """将关键词列表编译为单个正则（多选分支），一次 search 完成整组匹配"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+# 未安装 pyahocorasick 时名称扫描使用的分组正则
+NAME_KEYWORD_PATTERNS = tuple(
+    (flag, _compile_keywords(keywords)) for flag, keywords in NAME_KEYWORD_GROUPS
+)
+ACCESSORY_ID_RE = _compile_keywords(ACCESSORY_ID_KEYWORDS)
+ACCESSORY_CATEGORY_RE = _compile_keywords(ACCESSORY_CATEGORIES)
+CORE_PART_RE = _compile_keywords(CORE_PART_KEYWORDS)
+
+
+# 商品数量达到该阈值时，批量分类改用 Hyperscan / Numba 扫描名称（编译开销才划算）
+HYPERSCAN_MIN_PRODUCTS = 10000
+
+# 流式处理时每批分类的商品数（满批时可使用 Hyperscan / Numba）
+CLASSIFY_BATCH_SIZE = HYPERSCAN_MIN_PRODUCTS
+
+# 优先级描述
+PRIORITY_DESCRIPTIONS = {
+    'P0': '核心产品 (整车)',
+    'P1': '重要配件 (电池/充电器/电机)',
+    'P2': '普通配件'
+}
+
+
+def _name_keyword_masks() -> dict:
+    """关键词 -> 所属分组位标记（同一关键词可属于多个分组）"""
+    keyword_masks = {}
+    for flag, keywords in NAME_KEYWORD_GROUPS:
+        for keyword in keywords:
+            keyword_masks[keyword] = keyword_masks.get(keyword, 0) | flag
+    return keyword_masks
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str):
+    """
+    按需导入可选依赖，未安装时返回 None
 
-def classify_product_priority(product: dict) -> str:
+    可选依赖（见 requirements-optional.txt）只在对应的扫描/读写路径第一次
+    用到时才导入，导入脚本本身不会加载 numba、hyperscan 等重量级模块。
     """
-    根据商品信息分类优先级
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _get_keyword_automaton():
+    """按需构建 Aho-Corasick 自动机，每个关键词映射到其所属分组的位标记；未安装 pyahocorasick 时返回 None"""
+    ahocorasick = _optional_module('ahocorasick')  # 可选依赖：多模式匹配，一次扫描完成所有关键词分组
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for keyword, mask in _name_keyword_masks().items():
+        automaton.add_word(keyword, mask)
+    automaton.make_automaton()
+    return automaton
+
+
+_HYPERSCAN_DB = None
+_HYPERSCAN_MASKS: List[int] = []
+
+
+def _get_hyperscan_db():
+    """按需编译 Hyperscan 数据库，模式 ID 即 _HYPERSCAN_MASKS 的下标"""
+    global _HYPERSCAN_DB, _HYPERSCAN_MASKS
+    if _HYPERSCAN_DB is None:
+        hyperscan = _optional_module('hyperscan')
+        keyword_masks = _name_keyword_masks()
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[re.escape(kw).encode() for kw in keyword_masks],
+            ids=list(range(len(keyword_masks))),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(keyword_masks),
+        )
+        _HYPERSCAN_MASKS = list(keyword_masks.values())
+        _HYPERSCAN_DB = db
+    return _HYPERSCAN_DB
+
+
+def _scan_names_hyperscan(names: List[str]) -> List[int]:
+    """使用 Hyperscan 扫描全部商品名称，返回每个名称的关键词分组位标记"""
+    db = _get_hyperscan_db()
+    masks = _HYPERSCAN_MASKS
+    results = []
+    flags = 0
+
+    def on_match(pattern_id, start, end, match_flags, context):
+        nonlocal flags
+        flags |= masks[pattern_id]
+
+    for name in names:
+        flags = 0
+        db.scan(name.encode(), match_event_handler=on_match)
+        results.append(flags)
+    return results
+
+
+# numba / numpy 在 _get_numba_kernel 中按需导入后写入这两个全局名，供内核编译时解析
+np = None
+prange = range
+
+
+def _scan_names_kernel(buffer, offsets, kw_buffer, kw_offsets, kw_masks):
+    """在拼接后的名称字节缓冲区上并行扫描关键词，返回每个名称的位标记（由 _get_numba_kernel 编译）"""
+    n = offsets.shape[0] - 1
+    result = np.zeros(n, dtype=np.uint8)
+    for i in prange(n):
+        start = offsets[i]
+        end = offsets[i + 1]
+        flags = 0
+        for k in range(kw_masks.shape[0]):
+            mask = kw_masks[k]
+            if flags & mask == mask:
+                continue
+            kw_start = kw_offsets[k]
+            kw_len = kw_offsets[k + 1] - kw_start
+            for j in range(start, end - kw_len + 1):
+                matched = True
+                for m in range(kw_len):
+                    if buffer[j + m] != kw_buffer[kw_start + m]:
+                        matched = False
+                        break
+                if matched:
+                    flags |= mask
+                    break
+        result[i] = flags
+    return result
+
+
+@lru_cache(maxsize=None)
+def _get_numba_kernel():
+    """按需导入 numba 并编译 _scan_names_kernel；未安装 numba 时返回 None"""
+    global np, prange
+    numba = _optional_module('numba')  # 可选依赖：JIT 编译的并行名称扫描（无 hyperscan 时用于大商品目录）
+    if numba is None:
+        return None
+
+    np = importlib.import_module('numpy')
+    prange = numba.prange
+    return numba.njit(parallel=True, cache=True)(_scan_names_kernel)
+
+
+_NUMBA_KEYWORDS = None
+
+
+def _get_numba_keywords():
+    """按需构建关键词字节表：(拼接的关键词字节, 偏移数组, 位标记数组)"""
+    global _NUMBA_KEYWORDS
+    if _NUMBA_KEYWORDS is None:
+        keyword_masks = _name_keyword_masks()
+        encoded = [kw.encode() for kw in keyword_masks]
+        _NUMBA_KEYWORDS = (
+            np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            np.cumsum([0] + [len(kw) for kw in encoded], dtype=np.int64),
+            np.array(list(keyword_masks.values()), dtype=np.uint8),
+        )
+    return _NUMBA_KEYWORDS
+
+
+def _scan_names_numba(names: List[str]) -> List[int]:
+    """
+    使用 Numba 内核扫描全部商品名称，返回每个名称的关键词分组位标记
+
+    所有名称编码后拼接成一个字节缓冲区，配合偏移数组定位每个名称。
+    UTF-8 下子串关系在字节层面保持不变，结果与逐个名称匹配一致。
+    """
+    kernel = _get_numba_kernel()
+    encoded = [name.encode() for name in names]
+    buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    offsets = np.cumsum([0] + [len(name) for name in encoded], dtype=np.int64)
+    return kernel(buffer, offsets, *_get_numba_keywords()).tolist()
+
+
+def _scan_names_blob(names: List[str]) -> List[int]:
+    """
+    按关键词逐个扫描拼接后的名称字节串，返回每个名称的关键词分组位标记
+
+    名称以换行符拼接（关键词不含换行符，匹配不会跨越名称），每个关键词
+    用 bytes.find 在整个字节串上查找，命中后按起始偏移二分定位所属名称，
+    并直接跳到下一个名称继续查找。未安装任何多模式匹配库时用于大批量分类。
+    """
+    encoded = [name.encode() for name in names]
+    blob = b'\n'.join(encoded)
+    starts = []
+    position = 0
+    for name in encoded:
+        starts.append(position)
+        position += len(name) + 1
+    starts.append(len(blob) + 1)
+
+    results = [0] * len(names)
+    for keyword, mask in _name_keyword_masks().items():
+        keyword = keyword.encode()
+        index = blob.find(keyword)
+        while index != -1:
+            name_index = bisect_right(starts, index) - 1
+            results[name_index] |= mask
+            index = blob.find(keyword, starts[name_index + 1])
+    return results
+
+
+def _match_keywords_automaton(automaton, name: str) -> int:
+    """用 Aho-Corasick 自动机扫描单个名称，返回关键词分组位标记"""
+    flags = 0
+    for _, mask in automaton.iter(name):
+        flags |= mask
+    return flags
+
+
+def _match_keywords_regex(name: str) -> int:
+    """用分组正则扫描单个名称，返回关键词分组位标记"""
+    flags = 0
+    for flag, pattern in NAME_KEYWORD_PATTERNS:
+        if pattern.search(name):
+            flags |= flag
+    return flags
+
+
+@lru_cache(maxsize=8192)
+def match_name_keywords(name: str) -> int:
+    """
+    扫描商品名称，返回命中的关键词分组位标记
 
     Args:
-        product: 商品数据字典
+        name: 小写的商品名称
 
     Returns:
-        优先级等级 ('P0', 'P1', 'P2')
+        KW_BIKE / KW_ACCESSORY / KW_CORE_PART / KW_BATTERY_ACCESSORY 的组合
+
+    同名商品（如不同颜色/尺寸的 SKU）直接复用缓存的扫描结果。
     """
-    name = product.get('name', '').lower()
-    product_id = product.get('id', '').lower()
-    category = product.get('category', '').lower()
+    automaton = _get_keyword_automaton()
+    if automaton is not None:
+        return _match_keywords_automaton(automaton, name)
+    return _match_keywords_regex(name)
+
+
+def _scan_names_ahocorasick(names: List[str]) -> List[int]:
+    """使用 Aho-Corasick 自动机逐个扫描商品名称"""
+    automaton = _get_keyword_automaton()
+    return [_match_keywords_automaton(automaton, name) for name in names]
+
+
+def _scan_names_regex(names: List[str]) -> List[int]:
+    """使用分组正则逐个扫描商品名称（不依赖任何可选库）"""
+    return list(map(_match_keywords_regex, names))
 
-    # ========== P0: 整车/核心产品 ==========
-    # 整车型号关键词 - 必须是完整的车辆描述
-    bike_patterns = [
-        'electric bike', 'e-bike', 'electric scooter',
-        'folding bike', 'city bike', 'commuter bike', 'cargo bike',
-        'fat tire bike', 'gravel bike', 'touring bike', 'utility bike',
-        'mountain bike', 'mini bike', 'hybrid bike', 'e-gravel'
-    ]
-
-    # 配件关键词（用于排除 - 如果包含这些则不是整车）
-    accessory_keywords = [
-        'battery', 'charger', 'motor', 'display', 'brake', 'chain',
-        'tube', 'rack', 'seat', 'saddle', 'pedal', 'tire', 'wheel',
-        'lock', 'key', 'cover', 'fender', 'light', 'bell', 'mirror',
-        'bag', 'basket', 'controller', 'throttle', 'cable', 'grip',
-        'kickstand', 'mudguard', 'horn', 'reflector', 'pannier',
-        'inner', 'outer', 'disc', 'rotor', 'lever', 'pad', 'shell',
-        'handlebar', 'stem', 'fork', 'frame', 'hub', 'spoke', 'rim',
-        'accelerator', 'sensor', ' for ', '-for-', 'strip', 'port',
-        'switch', 'rails', 'extender', 'combo', 'trailer', 'bushing',
-        'spring', 'clamp', 'cage', 'bottle', 'holder', 'hanger',
-        'derailleur', 'crank', 'crankset', 'freewheel', 'headset',
-        'hook', 'quick release', 'handlepost', 'seatpost', 'booster'
-    ]
-
-    # 配件类分类（如果在这些分类中，一定不是整车）
-    accessory_categories = ['accessories', 'replacement parts', 'batteries chargers']
 
+# 名称扫描后端：名称 -> (所需的可选依赖, 扫描函数)
+NAME_SCAN_BACKENDS = {
+    'hyperscan': ('hyperscan', _scan_names_hyperscan),
+    'numba': ('numba', _scan_names_numba),
+    'blob': (None, _scan_names_blob),
+    'ahocorasick': ('ahocorasick', _scan_names_ahocorasick),
+    'regex': (None, _scan_names_regex),
+}
+
+
+def _decide_priority(name: str, product_id: str, category: str, name_flags: int) -> str:
+    """
+    根据小写的名称/ID/分类和名称关键词位标记判定优先级
+
+    Returns:
+        优先级等级 ('P0', 'P1', 'P2')
+    """
+    # ========== P0: 整车/核心产品 ==========
     # 检查是否是整车
-    is_bike = any(bp in name for bp in bike_patterns)
-    has_accessory_keyword = any(ak in name for ak in accessory_keywords) or \
-                            any(ak.replace(' ', '-') in str(product_id) for ak in accessory_keywords)
-    is_accessory_category = any(ac in category for ac in accessory_categories)
+    is_bike = name_flags & KW_BIKE
+    has_accessory_keyword = name_flags & KW_ACCESSORY or ACCESSORY_ID_RE.search(product_id)
+    is_accessory_category = ACCESSORY_CATEGORY_RE.search(category)
 
     if is_bike and not has_accessory_keyword and not is_accessory_category:
         return 'P0'
 
     # ========== P1: 核心配件 (电池/充电器/电机) ==========
-    core_part_keywords = ['battery', 'charger', 'motor']
-
-    # 排除电池配件（如电池锁、电池盖）
-    battery_accessory_keywords = ['lock', 'cover', 'shell', 'base', 'rails', 'switch', 'port', 'strip', 'bag', 'rack']
-
-    is_core_part = any(kw in name for kw in core_part_keywords) or \
-                   any(kw in category for kw in core_part_keywords)
+    is_core_part = name_flags & KW_CORE_PART or CORE_PART_RE.search(category)
 
     if is_core_part:
         # 检查是否是电池配件而非电池本身
-        is_battery_accessory = any(kw in name for kw in battery_accessory_keywords)
+        is_battery_accessory = name_flags & KW_BATTERY_ACCESSORY
         if not is_battery_accessory or 'combo' in name:  # combo包含电池
             return 'P1'
 
@@ -92,79 +378,303 @@ def classify_product_priority(product: dict) -> str:
     return 'P2'
 
 
-def get_priority_description(priority: str) -> str:
-    """获取优先级描述"""
-    descriptions = {
-        'P0': '核心产品 (整车)',
-        'P1': '重要配件 (电池/充电器/电机)',
-        'P2': '普通配件'
-    }
-    return descriptions.get(priority, '未知')
+def classify_product_priority(product: dict) -> str:
+    """
+    根据商品信息分类优先级
+
+    Args:
+        product: 商品数据字典
+
+    Returns:
+        优先级等级 ('P0', 'P1', 'P2')
+    """
+    name = product.get('name', '').lower()
+    product_id = product.get('id', '').lower()
+    category = product.get('category', '').lower()
+    return _decide_priority(name, product_id, category, match_name_keywords(name))
+
+
+def lowercase_columns(products: List[dict]) -> Tuple[List[str], List[str], List[str]]:
+    """按列取出小写的名称/ID/分类，每个字段只做一次 lower()"""
+    names = [p.get('name', '').lower() for p in products]
+    product_ids = [p.get('id', '').lower() for p in products]
+    categories = [p.get('category', '').lower() for p in products]
+    return names, product_ids, categories
+
+
+def classify_columns(names: List[str], product_ids: List[str], categories: List[str],
+                     backend: Optional[str] = None) -> List[str]:
+    """
+    按列分类商品优先级
+
+    先整列扫描名称关键词，再逐行判定优先级。
+
+    Args:
+        names: 小写的商品名称列表
+        product_ids: 小写的商品 ID 列表
+        categories: 小写的商品分类列表
+        backend: 强制使用的名称扫描后端（NAME_SCAN_BACKENDS 的键），默认按商品数和已安装的库自动选择
+
+    Returns:
+        与输入顺序一致的优先级列表
+
+    Raises:
+        ValueError: 后端名称未知
+        ImportError: 后端所需的可选依赖未安装
+    """
+    large = len(names) >= HYPERSCAN_MIN_PRODUCTS
+    if backend is not None:
+        if backend not in NAME_SCAN_BACKENDS:
+            raise ValueError(f"未知的名称扫描后端: {backend}")
+        module, scan = NAME_SCAN_BACKENDS[backend]
+        if module is not None and _optional_module(module) is None:
+            raise ImportError(f"名称扫描后端 {backend} 需要安装 {module}")
+        name_flags = scan(names)
+    elif large and _optional_module('hyperscan') is not None:
+        name_flags = _scan_names_hyperscan(names)
+    elif large and _get_numba_kernel() is not None:
+        name_flags = _scan_names_numba(names)
+    elif large and _get_keyword_automaton() is None:
+        name_flags = _scan_names_blob(names)
+    else:
+        name_flags = list(map(match_name_keywords, names))
+    return list(map(_decide_priority, names, product_ids, categories, name_flags))
+
+
+def classify_products(products: List[dict], backend: Optional[str] = None) -> List[str]:
+    """
+    批量分类商品优先级
+
+    结果与逐个调用 classify_product_priority 相同。
+
+    Args:
+        products: 商品数据字典列表
+        backend: 强制使用的名称扫描后端，见 classify_columns
+
+    Returns:
+        与 products 顺序一致的优先级列表
+    """
+    return classify_columns(*lowercase_columns(products), backend=backend)
+
+
+def classify_batches(batches: Iterable[List[dict]],
+                     max_workers: Optional[int] = None) -> Iterator[Tuple[List[dict], List[str]]]:
+    """
+    按顺序产出 (批次, 优先级列表)
+
+    只有一个批次时在当前进程内分类；多个批次时使用进程池并行分类，
+    同时在途的批次数不超过 2 倍进程数，避免一次性读入所有商品。
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return
+    second = next(batches, None)
+    if second is None:
+        yield first, classify_products(first)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in chain((first, second), batches):
+            # 只把分类需要的三列小写字符串传给子进程，减少进程间序列化开销
+            columns = lowercase_columns(batch)
+            pending.append((batch, pool.submit(classify_columns, *columns)))
+            if len(pending) >= workers * 2:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+
+def _load_json(products_file: Path) -> dict:
+    """一次性读取整个 JSON 文件（未安装 ijson 时使用）"""
+    orjson = _optional_module('orjson')  # 可选依赖：更快的 JSON 编解码
+    if orjson is not None:
+        return orjson.loads(products_file.read_bytes())
+
+    with open(products_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_metadata(products_file: Path) -> dict:
+    """读取商品文件的 metadata；安装了 ijson 时只解析到 metadata 为止"""
+    ijson = _optional_module('ijson')  # 可选依赖：流式解析商品文件，避免一次性载入整个文件
+    if ijson is not None:
+        with open(products_file, 'rb') as f:
+            return next(ijson.items(f, 'metadata', use_float=True), {})
+
+    return _load_json(products_file).get('metadata', {})
+
+
+def iter_products(products_file: Path) -> Iterator[dict]:
+    """逐个产出商品；安装了 ijson 时流式解析，内存占用与商品总数无关"""
+    ijson = _optional_module('ijson')
+    if ijson is not None:
+        with open(products_file, 'rb') as f:
+            yield from ijson.items(f, 'products.item', use_float=True)
+        return
+
+    yield from _load_json(products_file).get('products', [])
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[list]:
+    """按固定大小分批"""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def apply_priorities(products: Iterable[dict], priorities: Iterable[str]) -> Iterator[dict]:
+    """为商品依次设置优先级"""
+    for product, priority in zip(products, priorities):
+        product['priority'] = priority
+        yield product
+
+
+def _dumps_nested(obj, indent: str) -> str:
+    """json.dumps(indent=2) 后为除首行外的各行加上嵌套缩进"""
+    orjson = _optional_module('orjson')
+    if orjson is not None:
+        text = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return text.replace('\n', '\n' + indent)
+
+
+def write_products_file(products_file: Path, metadata: dict, products: Iterable[dict]) -> int:
+    """
+    增量写出商品文件
+
+    输出格式与 json.dump({'metadata': ..., 'products': ...}, indent=2, ensure_ascii=False)
+    相同，但逐个序列化商品，不需要在内存中保留全部商品。先写入临时文件，
+    完成后替换原文件。
+
+    Returns:
+        写出的商品数
+    """
+    tmp_file = products_file.with_name(products_file.name + '.tmp')
+    count = 0
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write('{\n  "metadata": ')
+        f.write(_dumps_nested(metadata, '  '))
+        f.write(',\n  "products": [')
+        for product in products:
+            f.write(',\n    ' if count else '\n    ')
+            f.write(_dumps_nested(product, '    '))
+            count += 1
+        f.write('\n  ]\n}' if count else ']\n}')
+
+    os.replace(tmp_file, products_file)
+    return count
 
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='更新商品优先级')
+    parser.add_argument(
+        '--rewrite',
+        action='store_true',
+        help='同时将优先级写回 data/products.json（默认只写入 data/products.priority_overlay.json）'
+    )
+    parser.add_argument(
+        '--shard',
+        action='store_true',
+        help='按优先级输出分片文件 data/products.P0.json 等，供 pytest --priority 直接加载'
+    )
+    args = parser.parse_args()
+
     print("="*70)
     print("📦 更新商品优先级")
     print("="*70)
 
-    # 加载商品数据
+    # 加载商品数据（流式读取，分批分类）
     products_file = PROJECT_ROOT / "data" / "products.json"
-    with open(products_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    products = data.get("products", [])
-    metadata = data.get("metadata", {})
-
-    print(f"\n加载了 {len(products)} 个商品")
+    metadata = load_metadata(products_file)
 
     # 统计
     priority_counts = {'P0': 0, 'P1': 0, 'P2': 0}
-    priority_examples = {'P0': [], 'P1': [], 'P2': []}
+    priority_examples = {p: deque(maxlen=5) for p in ('P0', 'P1', 'P2')}
+    priorities: List[str] = []
+    product_ids: List[str] = []
 
-    # 更新优先级
-    for product in products:
-        priority = classify_product_priority(product)
-        product['priority'] = priority
-        priority_counts[priority] += 1
+    # 计算优先级
+    batches = iter_batches(iter_products(products_file), CLASSIFY_BATCH_SIZE)
+    for batch, batch_priorities in classify_batches(batches):
+        priorities.extend(batch_priorities)
+
+        for product, priority in zip(batch, batch_priorities):
+            product_ids.append(product['id'])
+            priority_counts[priority] += 1
 
-        # 收集示例
-        if len(priority_examples[priority]) < 5:
+            # 收集示例
             priority_examples[priority].append(product['name'])
 
+    total = len(priorities)
+    print(f"\n加载了 {total} 个商品")
+
     # 打印统计
     print("\n📊 优先级分布:")
     print("-"*50)
     for p in ['P0', 'P1', 'P2']:
-        pct = priority_counts[p] / len(products) * 100 if products else 0
-        print(f"  {p} ({get_priority_description(p)}): {priority_counts[p]} ({pct:.1f}%)")
+        pct = priority_counts[p] / total * 100 if total else 0
+        print(f"  {p} ({PRIORITY_DESCRIPTIONS.get(p, '未知')}): {priority_counts[p]} ({pct:.1f}%)")
 
     # 打印示例
     print("\n📋 各优先级示例商品:")
     print("-"*50)
     for p in ['P0', 'P1', 'P2']:
-        print(f"\n{p} - {get_priority_description(p)}:")
+        print(f"\n{p} - {PRIORITY_DESCRIPTIONS.get(p, '未知')}:")
         for name in priority_examples[p]:
             print(f"  • {name[:60]}")
 
     # 更新元数据
-    metadata['priority_updated_at'] = datetime.now().isoformat()
-    metadata['priority_counts'] = priority_counts
-    metadata['priority_logic'] = {
+    priority_updated_at = datetime.now().isoformat()
+    priority_logic = {
         'P0': '整车/电动车/滑板车 - 核心营收产品',
         'P1': '电池、充电器、电机 - 高价值核心配件',
         'P2': '其他配件 - 维护/升级配件'
     }
 
-    # 保存
-    data['products'] = products
-    data['metadata'] = metadata
-
-    with open(products_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"\n✅ 已更新 {len(products)} 个商品的优先级")
-    print(f"📄 保存到: {products_file}")
+    if args.rewrite:
+        metadata['priority_updated_at'] = priority_updated_at
+        metadata['priority_counts'] = priority_counts
+        metadata['priority_logic'] = priority_logic
+
+        # 写回商品文件（再次流式读取商品，写入优先级）
+        write_products_file(
+            products_file, metadata, apply_priorities(iter_products(products_file), priorities)
+        )
+        print(f"📄 已写回: {products_file}")
+
+    # 保存优先级覆盖层（只包含 id → 优先级，加载商品数据时合并）
+    # 在写回商品文件之后保存，覆盖层记录的是最终商品文件的修改时间
+    overlay_file = save_priority_overlay(
+        products_file,
+        dict(zip(product_ids, priorities)),
+        {
+            'updated_at': priority_updated_at,
+            'priority_counts': priority_counts,
+            'priority_logic': priority_logic
+        }
+    )
+
+    print(f"\n✅ 已更新 {total} 个商品的优先级")
+    print(f"📄 保存到: {overlay_file}")
+
+    if args.shard:
+        # 分片最后写出，保证比商品文件和覆盖层都新
+        for p in ['P0', 'P1', 'P2']:
+            shard_file = get_priority_shard_path(products_file, p)
+            shard_metadata = {**metadata, 'priority': p, 'source': products_file.name}
+            shard_products = (
+                product for product in apply_priorities(iter_products(products_file), priorities)
+                if product['priority'] == p
+            )
+            count = write_products_file(shard_file, shard_metadata, shard_products)
+            print(f"📄 {p} 分片: {shard_file} ({count} 个商品)")
 
 
 if __name__ == "__main__":
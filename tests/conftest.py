@@ -10,17 +10,22 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass
-from datetime import datetime
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 
 import pytest
 from pydantic import ValidationError
 from playwright.async_api import Page
 from playwright.sync_api import Page as SyncPage
 
-from core.models import Product
+from core.models import PRODUCT_LIST_ADAPTER, Product
+from core.priority_overlay import (
+    apply_priority_overlay,
+    find_priority_shard,
+    load_priority_overlay,
+)
 from pages.product_page import ProductPage
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,9 @@ logger = logging.getLogger(__name__)
 SCREENSHOT_DIR = Path("screenshots")
 SCREENSHOT_DIR.mkdir(exist_ok=True)
 
+# Maps node id separators ("::" and "/") to "_" for screenshot filenames
+_NODE_TRANS = str.maketrans({":": "_", "/": "_"})
+
 
 @dataclass(frozen=True)
 class ProductDataset:
@@ -37,6 +45,10 @@ class ProductDataset:
     path: Path
     metadata: Dict[str, Any]
     products: List[Product]
+    by_id: Dict[str, Product] = field(default_factory=dict)
+    # (lowercased category, product) pairs, overall and bucketed by priority
+    category_index: List[Tuple[str, Product]] = field(default_factory=list)
+    by_priority: Dict[str, List[Tuple[str, Product]]] = field(default_factory=dict)
 
 
 _DATASET_CACHE: Dict[Path, ProductDataset] = {}
@@ -89,7 +101,7 @@ def _resolve_product_file(config: pytest.Config) -> Path:
 
     for candidate in candidates:
         if candidate.exists():
-            return candidate
+            return _priority_shard_or_self(candidate, config)
 
     pytest.skip(
         "未找到商品数据文件。请运行 scripts/discover_products.py 生成 "
@@ -97,6 +109,19 @@ def _resolve_product_file(config: pytest.Config) -> Path:
     )
 
 
+def _priority_shard_or_self(file_path: Path, config: pytest.Config) -> Path:
+    """
+    Use the per-priority shard written by scripts/update_product_priority.py --shard
+    when only one priority is requested and the shard is up to date.
+    """
+    priority = config.getoption("--priority")
+    if not priority or config.getoption("--product-id"):
+        return file_path
+
+    shard = find_priority_shard(file_path, priority.strip().upper())
+    return shard if shard is not None else file_path
+
+
 def _load_dataset_from_file(file_path: Path) -> ProductDataset:
     """Load the dataset from disk and convert entries into Product models."""
     try:
@@ -107,20 +132,36 @@ def _load_dataset_from_file(file_path: Path) -> ProductDataset:
 
     metadata = raw_data.get("metadata", {})
     products_raw = raw_data.get("products", [])
+    # Priorities computed by scripts/update_product_priority.py live in a
+    # side-car overlay file next to the dataset.
+    apply_priority_overlay(products_raw, load_priority_overlay(file_path))
 
-    products: List[Product] = []
     invalid_entries = 0
 
-    for entry in products_raw:
-        try:
-            products.append(Product(**entry))
-        except ValidationError as exc:
+    # Validate the whole list in one call; only when it fails, drop the
+    # offending entries (identified by the error locations) and revalidate.
+    try:
+        products: List[Product] = PRODUCT_LIST_ADAPTER.validate_python(products_raw)
+    except ValidationError as exc:
+        errors_by_index: Dict[int, List[str]] = {}
+        for error in exc.errors():
+            if error["loc"]:
+                errors_by_index.setdefault(error["loc"][0], []).append(
+                    f"{'.'.join(map(str, error['loc'][1:]))}: {error['msg']}"
+                )
+
+        valid_entries = []
+        for index, entry in enumerate(products_raw):
+            if index not in errors_by_index:
+                valid_entries.append(entry)
+                continue
             invalid_entries += 1
             logger.warning(
                 "Skipping invalid product entry %s: %s",
-                entry.get("id", "<unknown>"),
-                exc,
+                entry.get("id", "<unknown>") if isinstance(entry, dict) else "<unknown>",
+                "; ".join(errors_by_index[index]),
             )
+        products = PRODUCT_LIST_ADAPTER.validate_python(valid_entries)
 
     if not products:
         pytest.skip(f"{file_path} 不包含可用的商品数据。")
@@ -132,7 +173,23 @@ def _load_dataset_from_file(file_path: Path) -> ProductDataset:
             file_path,
         )
 
-    return ProductDataset(path=file_path, metadata=metadata, products=products)
+    by_id: Dict[str, Product] = {}
+    category_index: List[Tuple[str, Product]] = []
+    by_priority: Dict[str, List[Tuple[str, Product]]] = {}
+    for product in products:
+        by_id[product.id] = product
+        entry = (product.category.lower(), product)
+        category_index.append(entry)
+        by_priority.setdefault(product.priority.upper(), []).append(entry)
+
+    return ProductDataset(
+        path=file_path,
+        metadata=metadata,
+        products=products,
+        by_id=by_id,
+        category_index=category_index,
+        by_priority=by_priority,
+    )
 
 
 def _get_product_dataset(config: pytest.Config) -> ProductDataset:
@@ -146,16 +203,16 @@ def _get_product_dataset(config: pytest.Config) -> ProductDataset:
     return _DATASET_CACHE[cache_key]
 
 
-def _filter_products(products: List[Product], config: pytest.Config) -> List[Product]:
-    """Apply CLI filters to the loaded product list."""
+def _filter_products(dataset: ProductDataset, config: pytest.Config) -> List[Product]:
+    """Apply CLI filters to the loaded product dataset."""
     product_id = config.getoption("--product-id")
     if product_id:
-        match = next((p for p in products if p.id == product_id), None)
+        match = dataset.by_id.get(product_id)
         if not match:
             pytest.skip(f"商品 {product_id} 未在数据集中找到。")
         return [match]
 
-    filtered = list(products)
+    candidates = dataset.category_index
 
     priority = config.getoption("--priority")
     if priority:
@@ -164,14 +221,14 @@ def _filter_products(products: List[Product], config: pytest.Config) -> List[Pro
             raise pytest.UsageError(
                 f"未知的优先级 '{priority}'，请使用 P0/P1/P2。"
             )
-        filtered = [p for p in filtered if p.priority.upper() == normalized]
+        candidates = dataset.by_priority.get(normalized, [])
 
     category = config.getoption("--category")
     if category:
         keyword = category.strip().lower()
-        filtered = [p for p in filtered if keyword in p.category.lower()]
+        candidates = [entry for entry in candidates if keyword in entry[0]]
 
-    return filtered
+    return [product for _, product in candidates]
 
 
 def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
@@ -180,17 +237,25 @@ def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
         return
 
     dataset = _get_product_dataset(metafunc.config)
-    filtered_products = _filter_products(dataset.products, metafunc.config)
+    filtered_products = _filter_products(dataset, metafunc.config)
 
     if not filtered_products:
         pytest.skip(
             f"过滤条件没有匹配到任何商品（数据集: {dataset.path})."
         )
 
+    # Module scope groups each product's tests together so module-scoped
+    # fixtures (e.g. a page loaded once per product) can depend on it.
+    # The xdist_group mark keeps one product's tests on the same worker when
+    # running in parallel with ``-n auto --dist=loadgroup``.
     metafunc.parametrize(
         "test_product",
-        filtered_products,
+        [
+            pytest.param(product, marks=pytest.mark.xdist_group(product.id))
+            for product in filtered_products
+        ],
         ids=[product.id for product in filtered_products],
+        scope="module",
     )
 
 
@@ -203,7 +268,7 @@ def product_dataset(pytestconfig: pytest.Config) -> ProductDataset:
 @pytest.fixture(scope="session")
 def discovered_products(product_dataset: ProductDataset) -> Dict[str, Product]:
     """Map of product id -> Product for quick lookup inside tests."""
-    return {product.id: product for product in product_dataset.products}
+    return product_dataset.by_id
 
 
 @pytest.fixture(scope="session")
@@ -246,9 +311,9 @@ def pytest_runtest_makereport(item, call):
     # Only process failures during the actual test call (not setup/teardown)
     if report.when == "call" and report.failed:
         # Check if the test uses a Playwright page fixture
-        if "page" in item.fixturenames:
+        if "page" in item.fixturenames or "loaded_page" in item.fixturenames:
             try:
-                page = item.funcargs.get("page")
+                page = item.funcargs.get("page") or item.funcargs.get("loaded_page")
                 if page and isinstance(page, SyncPage):
                     _capture_screenshot_on_failure(item, page)
             except Exception as e:
@@ -263,10 +328,8 @@ def _capture_screenshot_on_failure(item: pytest.Item, page: SyncPage) -> None:
         item: The pytest test item
         page: The Playwright page object
     """
-    # Generate a unique filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    test_name = item.nodeid.replace("::", "_").replace("/", "_")
-    screenshot_name = f"FAILED_{test_name}_{timestamp}.png"
+    # Generate a unique filename with a nanosecond timestamp
+    screenshot_name = f"FAILED_{item.nodeid.translate(_NODE_TRANS)}_{time.time_ns()}.png"
     screenshot_path = SCREENSHOT_DIR / screenshot_name
 
     try:
@@ -19,19 +19,48 @@ Usage:
 
     # Test single product
     pytest tests/e2e/test_all_products.py --product-id=fiido-d11 -v
+
+    # Run products in parallel (pytest-xdist); one product per worker group
+    pytest tests/e2e/test_all_products.py -n auto --dist=loadgroup
+
+Each product page is navigated once (see ``loaded_page``) and shared by the
+three checks for that product.
 """
 
 from __future__ import annotations
 
+from typing import Any, Dict, Iterator
+
 import pytest
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Browser, Page, expect
 
 from core.models import Product
 
 
+@pytest.fixture(scope="module")
+def loaded_page(
+    browser: Browser,
+    browser_context_args: Dict[str, Any],
+    test_product: Product,
+) -> Iterator[Page]:
+    """
+    Navigate to the product page once per product and share it across tests.
+
+    ``test_product`` is parametrized at module scope (see tests/conftest.py),
+    so pytest groups the tests of one product together and this fixture is
+    created once per product.
+    """
+    context = browser.new_context(**browser_context_args)
+    page = context.new_page()
+    # Navigate with a longer timeout and less strict wait condition
+    page.goto(str(test_product.url), wait_until="domcontentloaded", timeout=60000)
+    yield page
+    context.close()
+
+
 def test_product_page_loads(
     test_product: Product,
-    page: Page,
+    loaded_page: Page,
 ) -> None:
     """
     Verify that the product page loads successfully.
@@ -41,8 +70,7 @@ def test_product_page_loads(
     - Page title contains product name or brand
     - Page URL matches expected product URL
     """
-    # Navigate to the product page with longer timeout and less strict wait condition
-    page.goto(str(test_product.url), wait_until="domcontentloaded", timeout=60000)
+    page = loaded_page
 
     # Verify the page loaded
     expect(page).to_have_url(str(test_product.url), timeout=10000)
@@ -58,7 +86,7 @@ def test_product_page_loads(
 
 def test_product_price_displayed(
     test_product: Product,
-    page: Page,
+    loaded_page: Page,
 ) -> None:
     """
     Verify that the product price is visible on the page.
@@ -67,12 +95,9 @@ def test_product_price_displayed(
     - Price element exists and is visible
     - Price text is not empty
     """
-    # Navigate to product page
-    page.goto(str(test_product.url), wait_until="domcontentloaded", timeout=60000)
-
     # Try to find price using selectors from product metadata
     price_selector = test_product.selectors.product_price
-    price_locator = page.locator(price_selector).first
+    price_locator = loaded_page.locator(price_selector).first
 
     # Check if price is visible
     expect(price_locator).to_be_visible(timeout=10000)
@@ -84,7 +109,7 @@ def test_product_price_displayed(
 
 def test_add_to_cart_button_exists(
     test_product: Product,
-    page: Page,
+    loaded_page: Page,
 ) -> None:
     """
     Verify that the add-to-cart button is visible and enabled.
@@ -94,12 +119,9 @@ def test_add_to_cart_button_exists(
     - Button is visible
     - Button is enabled (not disabled)
     """
-    # Navigate to product page
-    page.goto(str(test_product.url), wait_until="domcontentloaded", timeout=60000)
-
     # Try to find add-to-cart button using selectors from product metadata
     add_to_cart_selector = test_product.selectors.add_to_cart_button
-    add_to_cart_btn = page.locator(add_to_cart_selector).first
+    add_to_cart_btn = loaded_page.locator(add_to_cart_selector).first
 
     # Check if add-to-cart button is visible
     expect(add_to_cart_btn).to_be_visible(timeout=10000)
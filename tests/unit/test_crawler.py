@@ -5,13 +5,85 @@ ProductCrawler 单元测试
 """
 
 import json
-from unittest.mock import Mock, patch, MagicMock
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional
+from unittest.mock import patch, MagicMock
 import pytest
 import requests
 
 from core.crawler import ProductCrawler
 from core.models import Product, ProductVariant, Selectors
 
+try:
+    import orjson  # 可选依赖：更快的 JSON 解析
+except ImportError:
+    orjson = None
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture(scope="module")
+def crawler():
+    """模块内共享的 ProductCrawler 实例，避免每个测试重复创建 Session；关闭缓存，不写入 data/cache/"""
+    crawler = ProductCrawler(use_cache=False)
+    yield crawler
+    crawler.close()
+
+
+@pytest.fixture(scope="session")
+def json_pages():
+    """按页码顺序加载 Shopify products.json 分页响应数据"""
+    loads = orjson.loads if orjson is not None else json.loads
+    return [loads(path.read_bytes()) for path in sorted(FIXTURES_DIR.glob("products_page*.json"))]
+
+
+@dataclass
+class FakeResponse:
+    """预先构造好的 HTTP 响应"""
+
+    status_code: int = 200
+    text: str = ""
+    payload: Any = None
+    content: Optional[bytes] = None
+
+    def json(self):
+        if self.content is not None:
+            return json.loads(self.content)
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+
+@dataclass
+class FakeHTTP:
+    """按顺序返回响应的假 Session.get，最后一个响应重复使用"""
+
+    responses: List[FakeResponse] = field(default_factory=list)
+    error: Optional[Exception] = None
+    calls: List[str] = field(default_factory=list)
+
+    def respond(self, *responses: FakeResponse):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        if self.error is not None:
+            raise self.error
+        return self.responses[min(len(self.calls), len(self.responses)) - 1]
+
+
+@pytest.fixture
+def http(monkeypatch, crawler):
+    """将共享爬虫的 session.get 替换为 FakeHTTP"""
+    fake = FakeHTTP()
+    monkeypatch.setattr(crawler.session, "get", fake.get)
+    return fake
+
 
 class TestProductCrawlerInit:
     """测试 ProductCrawler 初始化"""
@@ -24,6 +96,12 @@ class TestProductCrawlerInit:
         assert crawler.session is not None
         assert 'User-Agent' in crawler.session.headers
 
+    def test_init_configures_connection_pool(self, crawler):
+        """测试 Session 挂载了带连接池的适配器"""
+        for prefix in ('https://', 'http://'):
+            adapter = crawler.session.get_adapter(prefix + 'fiido.com')
+            assert adapter.poolmanager.connection_pool_kw['maxsize'] >= 32
+
     def test_init_with_custom_params(self):
         """测试使用自定义参数初始化"""
         crawler = ProductCrawler(
@@ -43,24 +121,19 @@ class TestProductCrawlerInit:
 class TestDiscoverCollections:
     """测试分类发现功能"""
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_collections_success(self, mock_get):
+    def test_discover_collections_success(self, crawler, http):
         """测试成功发现分类"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = """
-        <html>
-            <nav>
-                <a href="/collections/bikes">Bikes</a>
-                <a href="/collections/accessories">Accessories</a>
-                <a href="/collections/spare-parts">Spare Parts</a>
-                <a href="/about">About</a>
-            </nav>
-        </html>
-        """
-        mock_get.return_value = mock_response
+        http.respond(FakeResponse(text="""
+            <html>
+                <nav>
+                    <a href="/collections/bikes">Bikes</a>
+                    <a href="/collections/accessories">Accessories</a>
+                    <a href="/collections/spare-parts">Spare Parts</a>
+                    <a href="/about">About</a>
+                </nav>
+            </html>
+            """))
 
-        crawler = ProductCrawler()
         collections = crawler.discover_collections()
 
         assert len(collections) == 3
@@ -69,43 +142,31 @@ class TestDiscoverCollections:
         assert '/collections/spare-parts' in collections
         assert '/about' not in collections
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_collections_with_query_params(self, mock_get):
+    def test_discover_collections_with_query_params(self, crawler, http):
         """测试处理带查询参数的分类链接"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = """
-        <html>
-            <a href="/collections/bikes?sort=price">Bikes</a>
-            <a href="/collections/bikes#featured">Bikes Featured</a>
-        </html>
-        """
-        mock_get.return_value = mock_response
+        http.respond(FakeResponse(text="""
+            <html>
+                <a href="/collections/bikes?sort=price">Bikes</a>
+                <a href="/collections/bikes#featured">Bikes Featured</a>
+            </html>
+            """))
 
-        crawler = ProductCrawler()
         collections = crawler.discover_collections()
 
         # 应该去除查询参数和锚点，只保留一个
         assert collections == ['/collections/bikes']
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_collections_network_error(self, mock_get):
+    def test_discover_collections_network_error(self, crawler, http):
         """测试网络错误处理"""
-        mock_get.side_effect = requests.RequestException("Network error")
+        http.error = requests.RequestException("Network error")
 
-        crawler = ProductCrawler()
         with pytest.raises(requests.RequestException):
             crawler.discover_collections()
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_collections_empty_page(self, mock_get):
+    def test_discover_collections_empty_page(self, crawler, http):
         """测试空页面处理"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = "<html><body><p>No collections</p></body></html>"
-        mock_get.return_value = mock_response
+        http.respond(FakeResponse(text="<html><body><p>No collections</p></body></html>"))
 
-        crawler = ProductCrawler()
         collections = crawler.discover_collections()
 
         assert collections == []
@@ -114,8 +175,9 @@ class TestDiscoverCollections:
 class TestDiscoverProducts:
     """测试商品发现功能"""
 
+    @pytest.mark.no_cover
     @patch('core.crawler.ProductCrawler._discover_products_via_json')
-    def test_discover_products_via_json_success(self, mock_json):
+    def test_discover_products_via_json_success(self, mock_json, crawler):
         """测试通过 JSON API 成功发现商品"""
         mock_products = [
             Product(
@@ -132,16 +194,16 @@ class TestDiscoverProducts:
         ]
         mock_json.return_value = mock_products
 
-        crawler = ProductCrawler()
         products = crawler.discover_products('/collections/bikes')
 
         assert len(products) == 1
         assert products[0].name == "Test Bike"
         mock_json.assert_called_once()
 
+    @pytest.mark.no_cover
     @patch('core.crawler.ProductCrawler._discover_products_via_json')
     @patch('core.crawler.ProductCrawler._discover_products_via_html')
-    def test_discover_products_fallback_to_html(self, mock_html, mock_json):
+    def test_discover_products_fallback_to_html(self, mock_html, mock_json, crawler):
         """测试 JSON 失败时降级到 HTML 解析"""
         mock_json.side_effect = Exception("JSON API failed")
         mock_html.return_value = [
@@ -158,31 +220,86 @@ class TestDiscoverProducts:
             )
         ]
 
-        crawler = ProductCrawler()
         products = crawler.discover_products('/collections/bikes')
 
         assert len(products) == 1
         mock_json.assert_called_once()
         mock_html.assert_called_once()
 
+    @pytest.mark.no_cover
     @patch('core.crawler.ProductCrawler._discover_products_via_json')
-    def test_discover_products_with_limit(self, mock_json):
+    def test_discover_products_with_limit(self, mock_json, crawler):
         """测试限制商品数量"""
-        crawler = ProductCrawler()
         crawler.discover_products('/collections/bikes', limit=10)
 
         mock_json.assert_called_once_with('/collections/bikes', 10)
 
+    def test_discover_all_fetches_each_collection(self, crawler, http):
+        """测试并发抓取多个分类"""
+        http.respond(FakeResponse(payload={
+            'products': [
+                {'id': 321, 'title': 'Shared Bike', 'handle': 'shared-bike',
+                 'variants': [{'id': 1, 'price': '500.00'}]}
+            ]
+        }))
+
+        results = crawler.discover_all(['/collections/bikes', '/collections/scooters'])
+
+        assert [len(products) for products in results] == [1, 1]
+        assert sorted(http.calls) == [
+            'https://fiido.com/collections/bikes/products.json',
+            'https://fiido.com/collections/scooters/products.json',
+        ]
+
+    def test_discover_all_isolates_failed_collection(self, crawler):
+        """测试单个分类抓取失败时其他分类的结果不受影响"""
+        product = Product(
+            id="bike", name="Bike", url="https://fiido.com/products/bike",
+            category="Bikes", price_min=100.0, price_max=100.0, selectors=Selectors()
+        )
+
+        def discover(collection_path, limit=None):
+            if collection_path == '/collections/broken':
+                raise requests.RequestException("Network error")
+            return [product]
+
+        with patch.object(crawler, 'discover_products', side_effect=discover):
+            results = crawler.discover_all(['/collections/bikes', '/collections/broken'])
+
+        assert results == [[product], None]
+
+    def test_discover_all_limits_concurrent_requests(self, monkeypatch):
+        """测试所有分类线程合计的在途请求数不超过 max_concurrent_requests"""
+        crawler = ProductCrawler(use_cache=False, max_workers=6, max_concurrent_requests=2)
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def get(url, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return FakeResponse(payload={'products': []})
+
+        monkeypatch.setattr(crawler.session, "get", get)
+        try:
+            crawler.discover_all([f'/collections/c{i}' for i in range(6)])
+        finally:
+            crawler.close()
+
+        assert peak == 2
+
 
 class TestDiscoverProductsViaJSON:
     """测试 JSON API 商品发现"""
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_products_via_json_single_page(self, mock_get):
+    def test_discover_products_via_json_single_page(self, crawler, http):
         """测试单页商品抓取"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        http.respond(FakeResponse(payload={
             'products': [
                 {
                     'id': 123,
@@ -204,10 +321,8 @@ class TestDiscoverProductsViaJSON:
                     'available': True
                 }
             ]
-        }
-        mock_get.return_value = mock_response
+        }))
 
-        crawler = ProductCrawler()
         products = crawler._discover_products_via_json('/collections/bikes')
 
         assert len(products) == 1
@@ -216,60 +331,62 @@ class TestDiscoverProductsViaJSON:
         assert products[0].price_min == 999.0
         assert len(products[0].variants) == 1
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_products_via_json_multiple_pages(self, mock_get):
-        """测试多页商品抓取"""
-        # 第一页返回 30 个商品（触发翻页）
-        page1_response = Mock()
-        page1_response.status_code = 200
-        page1_response.json.return_value = {
-            'products': [
-                {
-                    'id': i,
-                    'title': f'Product {i}',
-                    'handle': f'product-{i}',
-                    'variants': [{'id': i * 10, 'price': '100.00', 'available': True}],
-                    'tags': [],
-                    'vendor': 'Test',
-                    'product_type': 'Test',
-                    'available': True
-                }
-                for i in range(30)
-            ]
-        }
+    def test_discover_products_via_json_raw_content(self, crawler, http):
+        """测试响应带原始字节时直接解码 content"""
+        body = {'products': [{
+            'id': 1, 'title': 'Bike', 'handle': 'bike',
+            'variants': [{'id': 2, 'price': '999.00', 'available': True}]
+        }]}
+        http.respond(FakeResponse(content=json.dumps(body).encode('utf-8')))
 
-        # 第二页返回 5 个商品（结束翻页）
-        page2_response = Mock()
-        page2_response.status_code = 200
-        page2_response.json.return_value = {
-            'products': [
-                {
-                    'id': i,
-                    'title': f'Product {i}',
-                    'handle': f'product-{i}',
-                    'variants': [{'id': i * 10, 'price': '100.00', 'available': True}],
-                    'tags': [],
-                    'vendor': 'Test',
-                    'product_type': 'Test',
-                    'available': True
-                }
-                for i in range(30, 35)
-            ]
-        }
+        products = crawler._discover_products_via_json('/collections/bikes')
 
-        mock_get.side_effect = [page1_response, page2_response]
+        assert [p.id for p in products] == ['1']
+
+    def test_discover_products_via_json_multiple_pages(self, crawler, http, json_pages, monkeypatch):
+        """测试多页商品抓取"""
+        # 每页上限设为 30：第一页 30 个商品（满页，触发翻页），第二页 5 个商品（结束翻页）
+        monkeypatch.setattr('core.crawler.JSON_PAGE_SIZE', 30)
+        monkeypatch.setattr('core.crawler.JSON_PAGE_WINDOW', 1)
+        monkeypatch.setattr('core.crawler.time.sleep', lambda seconds: None)
+        http.respond(*(FakeResponse(payload=page) for page in json_pages))
 
-        crawler = ProductCrawler()
         products = crawler._discover_products_via_json('/collections/bikes')
 
         assert len(products) == 35
-        assert mock_get.call_count == 2
+        assert len(http.calls) == 2
+
+    def test_discover_products_via_json_prefetches_full_pages(self, crawler, monkeypatch):
+        """测试首页满页后按窗口并发预取后续页面，遇到不满一页的页面结束"""
+        monkeypatch.setattr('core.crawler.JSON_PAGE_SIZE', 2)
+        monkeypatch.setattr('core.crawler.JSON_PAGE_WINDOW', 2)
+        monkeypatch.setattr('core.crawler.time.sleep', lambda seconds: None)
+
+        def product(i):
+            return {'id': i, 'title': f'Product {i}', 'handle': f'prefetch-{i}',
+                    'variants': [{'id': i, 'price': '10.00'}]}
+
+        # 第 1-3 页满页，第 4 页只有一个商品，之后为空
+        pages = {1: [product(1), product(2)], 2: [product(3), product(4)],
+                 3: [product(5), product(6)], 4: [product(7)]}
+        fetched = []
+
+        def fetch_page(json_url, page):
+            fetched.append(page)
+            return pages.get(page, [])
+
+        monkeypatch.setattr(crawler, '_fetch_json_page', fetch_page)
+
+        products = crawler._discover_products_via_json('/collections/bikes')
+
+        assert [p.id for p in products] == [str(i) for i in range(1, 8)]
+        assert sorted(fetched) == [1, 2, 3, 4, 5]
 
 
 class TestParseProductFromJSON:
     """测试 JSON 商品解析"""
 
-    def test_parse_product_from_json_complete(self):
+    def test_parse_product_from_json_complete(self, crawler):
         """测试解析完整的商品数据"""
         product_data = {
             'id': 123456,
@@ -299,7 +416,6 @@ class TestParseProductFromJSON:
             'available': True
         }
 
-        crawler = ProductCrawler()
         product = crawler._parse_product_from_json(product_data, '/collections/bikes')
 
         assert product is not None
@@ -312,7 +428,7 @@ class TestParseProductFromJSON:
         assert len(product.variants) == 2
         assert len(product.tags) == 3
 
-    def test_parse_product_from_json_no_price(self):
+    def test_parse_product_from_json_no_price(self, crawler):
         """测试解析无价格商品（应跳过）"""
         product_data = {
             'id': 123,
@@ -325,16 +441,14 @@ class TestParseProductFromJSON:
             'available': False
         }
 
-        crawler = ProductCrawler()
         product = crawler._parse_product_from_json(product_data, '/collections/test')
 
         assert product is None
 
-    def test_parse_product_from_json_invalid_data(self):
+    def test_parse_product_from_json_invalid_data(self, crawler):
         """测试解析无效数据"""
         product_data = {'invalid': 'data'}
 
-        crawler = ProductCrawler()
         product = crawler._parse_product_from_json(product_data, '/collections/test')
 
         assert product is None
@@ -343,133 +457,74 @@ class TestParseProductFromJSON:
 class TestParseVariantFromJSON:
     """测试 JSON 变体解析"""
 
-    def test_parse_variant_color(self):
-        """测试解析颜色变体"""
+    @pytest.mark.parametrize(
+        "options,available,expected",
+        [
+            (('Black', None, None), True, ('Black', 'color')),
+            (('Large', None, None), True, ('Large', 'size')),
+            (('Black', 'Large', 'Premium'), False, ('Black / Large / Premium', 'color')),
+            (('Default Title', None, None), True, None),
+        ],
+        ids=['color', 'size', 'multiple_options', 'default_title']
+    )
+    def test_parse_variant(self, crawler, options, available, expected):
+        """测试解析颜色/尺寸/多选项变体，默认标题（无变体）返回 None"""
         variant_data = {
             'id': 123,
-            'option1': 'Black',
-            'option2': None,
-            'option3': None,
-            'available': True,
+            'option1': options[0],
+            'option2': options[1],
+            'option3': options[2],
+            'available': available,
             'price': '100.00'
         }
 
-        crawler = ProductCrawler()
         variant = crawler._parse_variant_from_json(variant_data)
 
-        assert variant is not None
-        assert variant.name == 'Black'
-        assert variant.type == 'color'
-        assert variant.available is True
-
-    def test_parse_variant_size(self):
-        """测试解析尺寸变体"""
-        variant_data = {
-            'id': 124,
-            'option1': 'Large',
-            'option2': None,
-            'option3': None,
-            'available': True,
-            'price': '100.00'
-        }
-
-        crawler = ProductCrawler()
-        variant = crawler._parse_variant_from_json(variant_data)
-
-        assert variant is not None
-        assert variant.name == 'Large'
-        assert variant.type == 'size'
-
-    def test_parse_variant_multiple_options(self):
-        """测试解析多选项变体"""
-        variant_data = {
-            'id': 125,
-            'option1': 'Black',
-            'option2': 'Large',
-            'option3': 'Premium',
-            'available': False,
-            'price': '150.00'
-        }
-
-        crawler = ProductCrawler()
-        variant = crawler._parse_variant_from_json(variant_data)
+        if expected is None:
+            assert variant is None
+            return
 
         assert variant is not None
-        assert variant.name == 'Black / Large / Premium'
-        assert variant.available is False
-
-    def test_parse_variant_default_title(self):
-        """测试解析默认标题（无变体）"""
-        variant_data = {
-            'id': 126,
-            'option1': 'Default Title',
-            'option2': None,
-            'option3': None,
-            'available': True,
-            'price': '100.00'
-        }
-
-        crawler = ProductCrawler()
-        variant = crawler._parse_variant_from_json(variant_data)
-
-        assert variant is None
+        assert (variant.name, variant.type) == expected
+        assert variant.available is available
 
 
 class TestInferVariantType:
     """测试变体类型推断"""
 
-    def test_infer_color_type(self):
-        """测试推断颜色类型"""
-        crawler = ProductCrawler()
-        assert crawler._infer_variant_type('Black') == 'color'
-        assert crawler._infer_variant_type('White') == 'color'
-        assert crawler._infer_variant_type('Deep Blue') == 'color'
-
-    def test_infer_size_type(self):
-        """测试推断尺寸类型"""
-        crawler = ProductCrawler()
-        assert crawler._infer_variant_type('Small') == 'size'
-        assert crawler._infer_variant_type('L') == 'size'
-        assert crawler._infer_variant_type('XL') == 'size'
-
-    def test_infer_configuration_type(self):
-        """测试推断配置类型"""
-        crawler = ProductCrawler()
-        assert crawler._infer_variant_type('Standard') == 'configuration'
-        assert crawler._infer_variant_type('Pro') == 'configuration'
-        assert crawler._infer_variant_type('Premium Edition') == 'configuration'
-
-    def test_infer_style_type(self):
-        """测试推断样式类型（默认）"""
-        crawler = ProductCrawler()
-        assert crawler._infer_variant_type('Sport') == 'style'
-        assert crawler._infer_variant_type('Classic') == 'style'
-        assert crawler._infer_variant_type('Unknown Option') == 'style'
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ('Black', 'color'), ('White', 'color'), ('Deep Blue', 'color'),
+            ('Small', 'size'), ('L', 'size'), ('XL', 'size'),
+            ('Standard', 'configuration'), ('Pro', 'configuration'),
+            ('Premium Edition', 'configuration'),
+            ('Sport', 'style'), ('Classic', 'style'), ('Unknown Option', 'style'),
+        ]
+    )
+    def test_infer_variant_type(self, crawler, value, expected):
+        """测试推断颜色/尺寸/配置/样式（默认）类型"""
+        assert crawler._infer_variant_type(value) == expected
 
 
 class TestDiscoverProductsViaHTML:
     """测试 HTML 解析商品发现"""
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_products_via_html_success(self, mock_get):
+    def test_discover_products_via_html_success(self, crawler, http):
         """测试通过 HTML 成功发现商品"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = """
-        <html>
-            <div class="product-grid">
-                <div class="product-item">
-                    <a href="/products/bike-1">Bike 1</a>
-                </div>
-                <div class="product-item">
-                    <a href="/products/bike-2">Bike 2</a>
+        http.respond(FakeResponse(text="""
+            <html>
+                <div class="product-grid">
+                    <div class="product-item">
+                        <a href="/products/bike-1">Bike 1</a>
+                    </div>
+                    <div class="product-item">
+                        <a href="/products/bike-2">Bike 2</a>
+                    </div>
                 </div>
-            </div>
-        </html>
-        """
-        mock_get.return_value = mock_response
+            </html>
+            """))
 
-        crawler = ProductCrawler()
         products = crawler._discover_products_via_html('/collections/bikes')
 
         assert len(products) == 2
@@ -477,43 +532,35 @@ class TestDiscoverProductsViaHTML:
         assert products[1].id == 'bike-2'
         assert products[0].category == 'Bikes'
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_products_via_html_with_limit(self, mock_get):
+    def test_discover_products_via_html_with_limit(self, crawler, http):
         """测试 HTML 解析时限制商品数量"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = """
-        <html>
-            <a href="/products/bike-1">Bike 1</a>
-            <a href="/products/bike-2">Bike 2</a>
-            <a href="/products/bike-3">Bike 3</a>
-        </html>
-        """
-        mock_get.return_value = mock_response
+        http.respond(FakeResponse(text="""
+            <html>
+                <a href="/products/bike-1">Bike 1</a>
+                <a href="/products/bike-2">Bike 2</a>
+                <a href="/products/bike-3">Bike 3</a>
+            </html>
+            """))
 
-        crawler = ProductCrawler()
         products = crawler._discover_products_via_html('/collections/bikes', limit=2)
 
         assert len(products) == 2
 
-    @patch('core.crawler.requests.Session.get')
-    def test_discover_products_via_html_deduplication(self, mock_get):
+    def test_discover_products_via_html_deduplication(self, crawler, http):
         """测试 HTML 解析时去重"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.text = """
-        <html>
-            <a href="/products/bike-1">Bike 1</a>
-            <a href="/products/bike-1">Bike 1 Duplicate</a>
-            <a href="/products/bike-1?variant=123">Bike 1 Variant</a>
-        </html>
-        """
-        mock_get.return_value = mock_response
+        http.respond(FakeResponse(text="""
+            <html>
+                <a href="/products/bike-1">Bike 1</a>
+                <a href="/products/bike-1">Bike 1 Duplicate</a>
+                <a href="/products/bike-1?variant=123">Bike 1 Variant</a>
+                <a href="/products/bike-1#reviews">Bike 1 Reviews</a>
+            </html>
+            """))
 
-        crawler = ProductCrawler()
         products = crawler._discover_products_via_html('/collections/bikes')
 
         assert len(products) == 1
+        assert products[0].id == 'bike-1'
 
 
 class TestCrawlerClose:
@@ -13,6 +13,7 @@ import pytest
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from core.crawler import ProductCrawler
 from core.models import Product, Selectors
 from scripts.discover_products import (
     load_existing_products,
@@ -144,12 +145,19 @@ class TestPrintStatistics:
         assert "执行耗时: 45.67 秒" in output
 
 
+def make_mock_crawler():
+    """关闭缓存的真实 ProductCrawler，只模拟 discover_products，保留 discover_all 的并发与错误处理"""
+    crawler = ProductCrawler(use_cache=False)
+    crawler.discover_products = Mock()
+    return crawler
+
+
 class TestDiscoverProductsFromCollections:
     """测试从分类发现商品"""
 
     def test_discover_from_single_collection(self):
         """测试从单个分类发现商品"""
-        mock_crawler = Mock()
+        mock_crawler = make_mock_crawler()
         mock_products = [
             Product(
                 id="1",
@@ -177,7 +185,7 @@ class TestDiscoverProductsFromCollections:
 
     def test_discover_with_existing_products(self):
         """测试增量更新模式"""
-        mock_crawler = Mock()
+        mock_crawler = make_mock_crawler()
         mock_products = [
             Product(
                 id="1",
@@ -221,7 +229,7 @@ class TestDiscoverProductsFromCollections:
 
     def test_discover_with_limit(self):
         """测试限制商品数量"""
-        mock_crawler = Mock()
+        mock_crawler = make_mock_crawler()
         mock_crawler.discover_products.return_value = []
 
         discover_products_from_collections(
@@ -234,7 +242,7 @@ class TestDiscoverProductsFromCollections:
 
     def test_discover_handles_errors(self):
         """测试处理错误情况"""
-        mock_crawler = Mock()
+        mock_crawler = make_mock_crawler()
         mock_crawler.discover_products.side_effect = Exception("Network error")
 
         products, new_count, updated_count = discover_products_from_collections(
@@ -0,0 +1,96 @@
+"""
+优先级覆盖层单元测试
+
+测试 core/priority_overlay.py 的读写与合并
+"""
+
+import json
+import os
+
+from core.priority_overlay import (
+    apply_priority_overlay,
+    find_priority_shard,
+    get_overlay_path,
+    get_priority_shard_path,
+    load_priority_overlay,
+    save_priority_overlay
+)
+
+
+class TestPriorityOverlay:
+    """测试优先级覆盖层"""
+
+    def test_missing_overlay_returns_empty(self, tmp_path):
+        """测试覆盖层不存在时返回空映射"""
+        products_file = tmp_path / "products.json"
+
+        assert load_priority_overlay(products_file) == {}
+
+    def test_save_and_load_overlay(self, tmp_path):
+        """测试保存后可读回覆盖层"""
+        products_file = tmp_path / "products.json"
+        products_file.write_text("{}", encoding="utf-8")
+
+        overlay_file = save_priority_overlay(
+            products_file,
+            {"bike": "P0", "battery": "P1"},
+            {"updated_at": "2025-12-01T10:00:00"}
+        )
+
+        assert overlay_file == get_overlay_path(products_file)
+        assert overlay_file.parent == tmp_path
+        data = json.loads(overlay_file.read_text(encoding="utf-8"))
+        assert data["updated_at"] == "2025-12-01T10:00:00"
+        assert load_priority_overlay(products_file) == {"bike": "P0", "battery": "P1"}
+
+    def test_overlay_named_after_products_file(self, tmp_path):
+        """测试同目录下不同商品文件的覆盖层互不影响"""
+        products_file = tmp_path / "products.json"
+        demo_file = tmp_path / "demo_products.json"
+        products_file.write_text("{}", encoding="utf-8")
+        demo_file.write_text("{}", encoding="utf-8")
+
+        overlay_file = save_priority_overlay(products_file, {"bike": "P0"})
+
+        assert overlay_file == tmp_path / "products.priority_overlay.json"
+        assert get_overlay_path(demo_file) == tmp_path / "demo_products.priority_overlay.json"
+        assert load_priority_overlay(demo_file) == {}
+
+    def test_overlay_stale_after_products_file_changes(self, tmp_path):
+        """测试覆盖层生成后商品文件被修改时视为过期"""
+        products_file = tmp_path / "products.json"
+        products_file.write_text("{}", encoding="utf-8")
+        save_priority_overlay(products_file, {"bike": "P0"})
+
+        products_file.write_text('{"products": []}', encoding="utf-8")
+
+        assert load_priority_overlay(products_file) == {}
+
+    def test_apply_overlay(self):
+        """测试只覆盖映射中存在的商品"""
+        products = [
+            {"id": "bike", "priority": "P1"},
+            {"id": "bell", "priority": "P1"},
+        ]
+
+        applied = apply_priority_overlay(products, {"bike": "P0", "unknown": "P2"})
+
+        assert applied == 1
+        assert products[0]["priority"] == "P0"
+        assert products[1]["priority"] == "P1"
+
+    def test_priority_shard_freshness(self, tmp_path):
+        """测试分片比商品文件旧时视为过期"""
+        products_file = tmp_path / "products.json"
+        products_file.write_text("{}", encoding="utf-8")
+        shard_file = get_priority_shard_path(products_file, "P0")
+
+        assert shard_file == tmp_path / "products.P0.json"
+        assert find_priority_shard(products_file, "P0") is None
+
+        shard_file.write_text("{}", encoding="utf-8")
+        os.utime(products_file, (1, 1))
+        assert find_priority_shard(products_file, "P0") == shard_file
+
+        os.utime(shard_file, (0, 0))
+        assert find_priority_shard(products_file, "P0") is None
@@ -5,6 +5,7 @@ ProductPage 单元测试
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
 import pytest
@@ -15,14 +16,64 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from pages.product_page import ProductPage
 from core.models import Product, ProductVariant, Selectors
 
+# --dist=loadgroup 时整个模块在同一 worker 执行，会话级 Mock 和示例数据只构建一次
+pytestmark = pytest.mark.xdist_group("product_page")
 
-@pytest.fixture
-def mock_page():
-    """创建 Mock Playwright Page 对象"""
+# 默认选择器配置，测试中只读，所有示例商品共用
+_DEFAULT_SELECTORS = Selectors()
+
+
+class AsyncStub:
+    """只返回固定值的异步桩
+
+    代替只用于提供返回值的 AsyncMock，构造和调用都比 AsyncMock 轻；
+    需要 side_effect 或 assert_called_* 断言时仍使用 AsyncMock。
+    """
+
+    def __init__(self, return_value=None):
+        self.return_value = return_value
+        self.calls = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.return_value
+
+
+@lru_cache(maxsize=None)
+def make_text_element(text):
+    """创建 text_content() 返回固定文本的 Mock 元素（按文本缓存，测试中只读取文本）"""
+    element = Mock()
+    element.text_content = AsyncStub(text)
+    return element
+
+
+def make_count_locator(count):
+    """创建 count() 返回固定数量的 Mock Locator"""
+    locator = Mock()
+    locator.count = AsyncStub(count)
+    return locator
+
+
+# is_in_stock 用到的两种 Locator：缺货标识不存在 / 存在
+_LOCATOR_EMPTY = make_count_locator(0)
+_LOCATOR_ONE = make_count_locator(1)
+
+# 选择器键名 → find_element 返回的元素，未列出的键返回 None
+_SELECTOR_ROUTES = {
+    'product_title': make_text_element("Test Title"),
+    'product_price': make_text_element("$999"),
+}
+
+
+@pytest.fixture(scope="session")
+def _mock_page_template():
+    """创建 Mock Playwright Page 对象（整个会话只构建一次）"""
     page = AsyncMock()
     page.goto = AsyncMock()
     page.wait_for_load_state = AsyncMock()
     page.click = AsyncMock()
+    # AsyncMock 被 await 时直接返回、不会让出事件循环，等待本身没有开销；
+    # 保留为 Mock 以便 TestSelectVariant 断言等待时长
     page.wait_for_timeout = AsyncMock()
     page.locator = Mock()
     page.screenshot = AsyncMock()
@@ -31,8 +82,15 @@ def mock_page():
 
 
 @pytest.fixture
+def mock_page(_mock_page_template):
+    """复用会话级 Mock Page，使用前清空调用记录及上个测试设置的返回值和异常"""
+    _mock_page_template.reset_mock(return_value=True, side_effect=True)
+    return _mock_page_template
+
+
+@pytest.fixture(scope="session")
 def sample_product():
-    """创建示例商品"""
+    """创建示例商品（测试中只读，整个会话共享）"""
     return Product(
         id="test-product",
         name="Test Electric Bike",
@@ -42,13 +100,13 @@ def sample_product():
         price_max=1299.0,
         currency="USD",
         variants=[],
-        selectors=Selectors()
+        selectors=_DEFAULT_SELECTORS
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_variant():
-    """创建示例变体"""
+    """创建示例变体（测试中只读，整个会话共享）"""
     return ProductVariant(
         name="Black",
         type="color",
@@ -57,15 +115,33 @@ def sample_variant():
     )
 
 
-@pytest.fixture
-def mock_selector_manager():
-    """创建 Mock SelectorManager"""
+@pytest.fixture(scope="session")
+def _mock_selector_manager_template():
+    """创建 Mock SelectorManager（整个会话只构建一次）"""
     mock_mgr = Mock()
-    mock_mgr.find_element = AsyncMock(return_value=None)
-    mock_mgr.get_selector = Mock(return_value="")
+    mock_mgr.find_element = AsyncMock()
+    mock_mgr.get_selector = Mock()
+    return mock_mgr
+
+
+@pytest.fixture
+def mock_selector_manager(_mock_selector_manager_template):
+    """复用会话级 Mock SelectorManager，重置后恢复默认返回值"""
+    mock_mgr = _mock_selector_manager_template
+    mock_mgr.reset_mock(return_value=True, side_effect=True)
+    mock_mgr.find_element.return_value = None
+    mock_mgr.get_selector.return_value = ""
     return mock_mgr
 
 
+@pytest.fixture
+def product_page_with_mgr(mock_page, sample_product, mock_selector_manager):
+    """创建使用 mock_selector_manager 的 ProductPage（默认找不到任何元素）"""
+    product_page = ProductPage(mock_page, sample_product)
+    product_page.selector_mgr = mock_selector_manager
+    return product_page
+
+
 class TestProductPageInit:
     """测试 ProductPage 初始化"""
 
@@ -81,7 +157,6 @@ class TestProductPageInit:
 class TestNavigate:
     """测试页面导航"""
 
-    @pytest.mark.asyncio
     async def test_navigate_success(self, mock_page, sample_product):
         """测试成功导航到商品页"""
         product_page = ProductPage(mock_page, sample_product)
@@ -91,7 +166,6 @@ class TestNavigate:
         call_args = mock_page.goto.call_args
         assert str(sample_product.url) in str(call_args)
 
-    @pytest.mark.asyncio
     async def test_navigate_with_wait_until(self, mock_page, sample_product):
         """测试使用自定义 wait_until 参数导航"""
         product_page = ProductPage(mock_page, sample_product)
@@ -99,7 +173,6 @@ class TestNavigate:
 
         mock_page.goto.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_navigate_failure(self, mock_page, sample_product):
         """测试导航失败"""
         mock_page.goto.side_effect = Exception("Navigation failed")
@@ -113,48 +186,28 @@ class TestNavigate:
 class TestGetTitle:
     """测试获取商品标题"""
 
-    @pytest.mark.asyncio
     async def test_get_title_success(self, mock_page, sample_product):
         """测试成功获取标题"""
-        mock_element = AsyncMock()
-        mock_element.text_content = AsyncMock(return_value="Test Bike Title")
+        mock_element = make_text_element("Test Bike Title")
 
         product_page = ProductPage(mock_page, sample_product)
 
         # Mock selector_mgr 实例
         mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=mock_element)
+        mock_selector_mgr.find_element = AsyncStub(mock_element)
         product_page.selector_mgr = mock_selector_mgr
 
         title = await product_page.get_title()
 
         assert title == "Test Bike Title"
 
-    @pytest.mark.asyncio
-    async def test_get_title_element_not_found(self, mock_page, sample_product):
-        """测试标题元素未找到"""
-        product_page = ProductPage(mock_page, sample_product)
-
-        # Mock selector_mgr 实例
-        mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=None)
-        product_page.selector_mgr = mock_selector_mgr
-
-        title = await product_page.get_title()
-
-        assert title is None
-
-    @pytest.mark.asyncio
     async def test_get_title_with_whitespace(self, mock_page, sample_product):
         """测试标题包含空白字符"""
-        mock_element = AsyncMock()
-        mock_element.text_content = AsyncMock(return_value="  Test Bike  \n")
+        mock_element = make_text_element("  Test Bike  \n")
 
-        product_page = ProductPage(mock_page, sample_product)
-        
         # Mock selector_mgr 实例
         mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=mock_element)
+        mock_selector_mgr.find_element = AsyncStub(mock_element)
 
         product_page = ProductPage(mock_page, sample_product)
         product_page.selector_mgr = mock_selector_mgr
@@ -167,17 +220,13 @@ class TestGetTitle:
 class TestGetPrice:
     """测试获取商品价格"""
 
-    @pytest.mark.asyncio
     async def test_get_price_success(self, mock_page, sample_product):
         """测试成功获取价格"""
-        mock_element = AsyncMock()
-        mock_element.text_content = AsyncMock(return_value="$999.00")
+        mock_element = make_text_element("$999.00")
 
-        product_page = ProductPage(mock_page, sample_product)
-        
         # Mock selector_mgr 实例
         mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=mock_element)
+        mock_selector_mgr.find_element = AsyncStub(mock_element)
 
         product_page = ProductPage(mock_page, sample_product)
         product_page.selector_mgr = mock_selector_mgr
@@ -186,27 +235,10 @@ class TestGetPrice:
 
         assert price == "$999.00"
 
-    @pytest.mark.asyncio
-    async def test_get_price_element_not_found(self, mock_page, sample_product):
-        """测试价格元素未找到"""
-        product_page = ProductPage(mock_page, sample_product)
-        
-        # Mock selector_mgr 实例
-        mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=None)
-
-        product_page = ProductPage(mock_page, sample_product)
-        product_page.selector_mgr = mock_selector_mgr
-
-        price = await product_page.get_price()
-
-        assert price is None
-
 
 class TestSelectVariant:
     """测试选择商品变体"""
 
-    @pytest.mark.asyncio
     async def test_select_variant_success(self, mock_page, sample_product, sample_variant):
         """测试成功选择变体"""
         product_page = ProductPage(mock_page, sample_product)
@@ -217,7 +249,6 @@ class TestSelectVariant:
         mock_page.click.assert_called_once_with(sample_variant.selector, timeout=3000)
         mock_page.wait_for_timeout.assert_called()
 
-    @pytest.mark.asyncio
     async def test_select_variant_with_custom_wait_time(self, mock_page, sample_product, sample_variant):
         """测试使用自定义等待时间选择变体"""
         product_page = ProductPage(mock_page, sample_product)
@@ -227,7 +258,6 @@ class TestSelectVariant:
         assert result is True
         mock_page.wait_for_timeout.assert_called_with(1000)
 
-    @pytest.mark.asyncio
     async def test_select_variant_failure(self, mock_page, sample_product, sample_variant):
         """测试选择变体失败"""
         mock_page.click.side_effect = Exception("Click failed")
@@ -242,17 +272,14 @@ class TestSelectVariant:
 class TestAddToCart:
     """测试加入购物车"""
 
-    @pytest.mark.asyncio
     async def test_add_to_cart_success(self, mock_page, sample_product):
         """测试成功加入购物车"""
         mock_add_button = AsyncMock()
         mock_add_button.click = AsyncMock()
 
-        product_page = ProductPage(mock_page, sample_product)
-        
         # Mock selector_mgr 实例
         mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=mock_add_button)
+        mock_selector_mgr.find_element = AsyncStub(mock_add_button)
 
         product_page = ProductPage(mock_page, sample_product)
         product_page.selector_mgr = mock_selector_mgr
@@ -262,33 +289,14 @@ class TestAddToCart:
         assert result is True
         mock_add_button.click.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_add_to_cart_button_not_found(self, mock_page, sample_product):
-        """测试加购按钮未找到"""
-        product_page = ProductPage(mock_page, sample_product)
-        
-        # Mock selector_mgr 实例
-        mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=None)
-
-        product_page = ProductPage(mock_page, sample_product)
-        product_page.selector_mgr = mock_selector_mgr
-
-        result = await product_page.add_to_cart()
-
-        assert result is False
-
-    @pytest.mark.asyncio
     async def test_add_to_cart_with_error(self, mock_page, sample_product):
         """测试加购时出现错误"""
         mock_add_button = AsyncMock()
         mock_add_button.click.side_effect = Exception("Click failed")
 
-        product_page = ProductPage(mock_page, sample_product)
-        
         # Mock selector_mgr 实例
         mock_selector_mgr = Mock()
-        mock_selector_mgr.find_element = AsyncMock(return_value=mock_add_button)
+        mock_selector_mgr.find_element = AsyncStub(mock_add_button)
 
         product_page = ProductPage(mock_page, sample_product)
         product_page.selector_mgr = mock_selector_mgr
@@ -298,15 +306,39 @@ class TestAddToCart:
         assert result is False
 
 
+class TestElementMissing:
+    """测试选择器找不到元素或查找出错时各方法的返回值"""
+
+    # (方法名, 期望返回值)
+    METHODS = [
+        ("get_title", None),
+        ("get_price", None),
+        ("add_to_cart", False),
+    ]
+
+    @pytest.mark.parametrize("method,expected", METHODS)
+    async def test_element_not_found(self, product_page_with_mgr, method, expected):
+        """测试元素未找到"""
+        result = await getattr(product_page_with_mgr, method)()
+
+        assert result is expected
+
+    @pytest.mark.parametrize("method,expected", METHODS)
+    async def test_find_element_error(self, product_page_with_mgr, mock_selector_manager, method, expected):
+        """测试查找元素时出现错误"""
+        mock_selector_manager.find_element.side_effect = Exception("Lookup failed")
+
+        result = await getattr(product_page_with_mgr, method)()
+
+        assert result is expected
+
+
 class TestIsInStock:
     """测试检查库存状态"""
 
-    @pytest.mark.asyncio
     async def test_is_in_stock_true(self, mock_page, sample_product):
         """测试商品有货"""
-        mock_locator = Mock()
-        mock_locator.count = AsyncMock(return_value=0)
-        mock_page.locator.return_value = mock_locator
+        mock_page.locator.return_value = _LOCATOR_EMPTY
 
         product_page = ProductPage(mock_page, sample_product)
 
@@ -314,12 +346,9 @@ class TestIsInStock:
 
         assert result is True
 
-    @pytest.mark.asyncio
     async def test_is_in_stock_false(self, mock_page, sample_product):
         """测试商品缺货"""
-        mock_locator = Mock()
-        mock_locator.count = AsyncMock(return_value=1)
-        mock_page.locator.return_value = mock_locator
+        mock_page.locator.return_value = _LOCATOR_ONE
 
         product_page = ProductPage(mock_page, sample_product)
 
@@ -331,38 +360,23 @@ class TestIsInStock:
 class TestGetAvailableVariants:
     """测试获取可用变体"""
 
-    @pytest.mark.asyncio
-    async def test_get_available_variants_empty(self, mock_page, sample_product):
+    async def test_get_available_variants_empty(self, mock_page, product_page_with_mgr):
         """测试无可用变体"""
-        mock_page.locator.return_value.all = AsyncMock(return_value=[])
-
-        product_page = ProductPage(mock_page, sample_product)
-        
-        # Mock selector_mgr 实例
-        mock_selector_mgr = Mock()
-        mock_selector_mgr.get_selector = Mock(return_value="")
-
-        product_page = ProductPage(mock_page, sample_product)
-        product_page.selector_mgr = mock_selector_mgr
+        mock_page.locator.return_value.all = AsyncStub([])
 
-        variants = await product_page.get_available_variants()
+        variants = await product_page_with_mgr.get_available_variants()
 
         assert variants == []
 
-    @pytest.mark.asyncio
     async def test_get_available_variants_with_colors(self, mock_page, sample_product):
         """测试获取颜色变体"""
-        mock_element1 = AsyncMock()
-        mock_element1.text_content = AsyncMock(return_value="Black")
-        mock_element2 = AsyncMock()
-        mock_element2.text_content = AsyncMock(return_value="White")
+        mock_element1 = make_text_element("Black")
+        mock_element2 = make_text_element("White")
 
         mock_locator = Mock()
-        mock_locator.all = AsyncMock(return_value=[mock_element1, mock_element2])
+        mock_locator.all = AsyncStub([mock_element1, mock_element2])
         mock_page.locator.return_value = mock_locator
 
-        product_page = ProductPage(mock_page, sample_product)
-        
         # Mock selector_mgr 实例
         mock_selector_mgr = Mock()
         mock_selector_mgr.get_selector = Mock(return_value=".color-swatch")
@@ -379,7 +393,6 @@ class TestGetAvailableVariants:
 class TestTakeScreenshot:
     """测试截图功能"""
 
-    @pytest.mark.asyncio
     async def test_take_screenshot_success(self, mock_page, sample_product):
         """测试成功截图"""
         product_page = ProductPage(mock_page, sample_product)
@@ -388,7 +401,6 @@ class TestTakeScreenshot:
 
         mock_page.screenshot.assert_called_once_with(path="test.png", full_page=True)
 
-    @pytest.mark.asyncio
     async def test_take_screenshot_failure(self, mock_page, sample_product):
         """测试截图失败"""
         mock_page.screenshot.side_effect = Exception("Screenshot failed")
@@ -402,37 +414,13 @@ class TestTakeScreenshot:
 class TestGetProductInfo:
     """测试获取完整商品信息"""
 
-    @pytest.mark.asyncio
-    async def test_get_product_info(self, mock_page, sample_product):
+    async def test_get_product_info(self, mock_page, product_page_with_mgr, mock_selector_manager):
         """测试获取完整商品信息"""
-        mock_locator = Mock()
-        mock_locator.count = AsyncMock(return_value=0)
-        mock_page.locator.return_value = mock_locator
-
-        mock_element_title = AsyncMock()
-        mock_element_title.text_content = AsyncMock(return_value="Test Title")
+        mock_page.locator.return_value = _LOCATOR_EMPTY
 
-        mock_element_price = AsyncMock()
-        mock_element_price.text_content = AsyncMock(return_value="$999")
-
-        product_page = ProductPage(mock_page, sample_product)
-        
-        # Mock selector_mgr 实例
-        mock_selector_mgr = Mock()
-        async def mock_find_element(page, key):
-            if key == 'product_title':
-                return mock_element_title
-            elif key == 'product_price':
-                return mock_element_price
-            return None
-
-        mock_selector_mgr.find_element = mock_find_element
-        mock_selector_mgr.get_selector = Mock(return_value="")
-
-        product_page = ProductPage(mock_page, sample_product)
-        product_page.selector_mgr = mock_selector_mgr
+        mock_selector_manager.find_element.side_effect = lambda page, key: _SELECTOR_ROUTES.get(key)
 
-        info = await product_page.get_product_info()
+        info = await product_page_with_mgr.get_product_info()
 
         assert info['title'] == "Test Title"
         assert info['price'] == "$999"
@@ -4,7 +4,10 @@ SelectorManager 单元测试
 测试选择器管理器的配置加载、选择器查找、后备机制等功能。
 """
 
+import copy
+import io
 import json
+import os
 import sys
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch
@@ -15,6 +18,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from core.selector_manager import SelectorManager
 
+# --dist=loadgroup 时整个模块在同一 worker 执行，会话级 manager 只加载一次
+pytestmark = pytest.mark.xdist_group("selector_manager")
+
+
+@pytest.fixture(scope="session")
+def manager():
+    """创建 SelectorManager 实例（整个会话只加载一次配置，测试中只读）"""
+    return SelectorManager(config_path="config/selectors.json")
+
 
 class TestSelectorManagerInit:
     """测试 SelectorManager 初始化"""
@@ -43,21 +55,40 @@ class TestSelectorManagerInit:
         with pytest.raises(json.JSONDecodeError):
             SelectorManager(config_path=str(config_path))
 
+    def test_config_cached_until_file_changes(self, tmp_path):
+        """测试配置按文件 mtime 缓存，实例之间互不影响"""
+        config_path = tmp_path / "selectors.json"
+        config_path.write_text(json.dumps({'base_selectors': {'product_title': 'h1'}}), encoding='utf-8')
+
+        first = SelectorManager(config_path=str(config_path))
+        first.update_selector('product_title', '.changed')
+        second = SelectorManager(config_path=str(config_path))
+        assert second.get_selector('product_title') == 'h1'
+
+        config_path.write_text(json.dumps({'base_selectors': {'product_title': 'h2'}}), encoding='utf-8')
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        third = SelectorManager(config_path=str(config_path))
+        assert third.get_selector('product_title') == 'h2'
+
 
 class TestGetSelector:
     """测试获取选择器"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
-
-    def test_get_existing_selector(self, manager):
-        """测试获取存在的选择器"""
-        selector = manager.get_selector('product_title')
-        assert selector
-        assert isinstance(selector, str)
-        assert len(selector) > 0
+    # 配置文件中各类型下存在的选择器：(键名, 选择器类型)
+    CONFIGURED_KEYS = [
+        ('product_title', 'base_selectors'),
+        ('product_price', 'base_selectors'),
+        ('add_to_cart_button', 'base_selectors'),
+        ('color', 'variant_selectors'),
+        ('email', 'checkout_selectors'),
+    ]
+
+    def test_get_existing_selectors(self, manager):
+        """测试批量获取各类型下存在的选择器"""
+        for key, selector_type in self.CONFIGURED_KEYS:
+            selector = manager.get_selector(key, selector_type=selector_type)
+            assert isinstance(selector, str) and selector, f"{selector_type}.{key}"
 
     def test_get_nonexistent_selector_with_fallback(self, manager):
         """测试获取不存在的选择器（启用后备）"""
@@ -70,29 +101,10 @@ class TestGetSelector:
         selector = manager.get_selector('nonexistent_key', fallback=False)
         assert selector == ''
 
-    def test_get_selector_with_type(self, manager):
-        """测试获取不同类型的选择器"""
-        # base_selectors
-        base_selector = manager.get_selector('product_title', selector_type='base_selectors')
-        assert base_selector
-
-        # variant_selectors
-        variant_selector = manager.get_selector('color', selector_type='variant_selectors')
-        assert variant_selector
-
-        # checkout_selectors
-        checkout_selector = manager.get_selector('email', selector_type='checkout_selectors')
-        assert checkout_selector
-
 
 class TestFallbackSelectors:
     """测试后备选择器"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
-
     def test_fallback_product_title(self, manager):
         """测试 product_title 后备选择器"""
         fallback = manager._get_fallback_selector('product_title')
@@ -119,12 +131,6 @@ class TestFallbackSelectors:
 class TestFindElement:
     """测试查找元素"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
-
-    @pytest.mark.asyncio
     async def test_find_element_success(self, manager):
         """测试成功找到元素"""
         # Mock Playwright Page
@@ -137,7 +143,6 @@ class TestFindElement:
         element = await manager.find_element(mock_page, 'product_title')
         assert element is not None
 
-    @pytest.mark.asyncio
     async def test_find_element_not_found(self, manager):
         """测试找不到元素"""
         # Mock Playwright Page
@@ -150,7 +155,6 @@ class TestFindElement:
         element = await manager.find_element(mock_page, 'product_title')
         assert element is None
 
-    @pytest.mark.asyncio
     async def test_find_element_tries_multiple_selectors(self, manager):
         """测试尝试多个选择器"""
         # Mock Playwright Page
@@ -181,22 +185,13 @@ class TestFindElement:
 class TestGetAllSelectors:
     """测试获取所有选择器"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
-
-    def test_get_all_base_selectors(self, manager):
-        """测试获取所有基础选择器"""
-        selectors = manager.get_all_selectors('base_selectors')
-        assert isinstance(selectors, dict)
-        assert len(selectors) > 0
-        assert 'product_title' in selectors
-
-    def test_get_all_variant_selectors(self, manager):
-        """测试获取所有变体选择器"""
-        selectors = manager.get_all_selectors('variant_selectors')
-        assert isinstance(selectors, dict)
+    def test_get_all_selectors_by_type(self, manager):
+        """测试批量获取每种类型的全部选择器"""
+        for selector_type in ('base_selectors', 'variant_selectors', 'checkout_selectors'):
+            selectors = manager.get_all_selectors(selector_type)
+            assert isinstance(selectors, dict) and selectors, selector_type
+
+        assert 'product_title' in manager.get_all_selectors('base_selectors')
 
     def test_get_all_nonexistent_type(self, manager):
         """测试获取不存在类型的选择器"""
@@ -207,11 +202,6 @@ class TestGetAllSelectors:
 class TestGetSelectorTypes:
     """测试获取选择器类型"""
 
-    @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
-
     def test_get_selector_types(self, manager):
         """测试获取所有选择器类型"""
         types = manager.get_selector_types()
@@ -225,9 +215,9 @@ class TestUpdateSelector:
     """测试更新选择器"""
 
     @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
+    def manager(self, manager):
+        """复制会话级实例，修改不影响其他测试"""
+        return copy.deepcopy(manager)
 
     def test_update_existing_selector(self, manager):
         """测试更新已存在的选择器"""
@@ -258,9 +248,9 @@ class TestSaveConfig:
     """测试保存配置"""
 
     @pytest.fixture
-    def manager(self):
-        """创建 SelectorManager 实例"""
-        return SelectorManager(config_path="config/selectors.json")
+    def manager(self, manager):
+        """复制会话级实例，修改不影响其他测试"""
+        return copy.deepcopy(manager)
 
     def test_save_config_to_new_path(self, manager, tmp_path):
         """测试保存配置到新路径"""
@@ -275,19 +265,17 @@ class TestSaveConfig:
 
         assert 'base_selectors' in saved_config
 
-    def test_save_config_preserves_changes(self, manager, tmp_path):
+    def test_save_config_preserves_changes(self, manager):
         """测试保存时保留更改"""
-        output_path = tmp_path / "test_selectors.json"
-
         # 修改选择器
         manager.update_selector('product_title', '.new-title')
 
-        # 保存
-        manager.save_config(output_path=str(output_path))
+        # 保存到内存中的文本流
+        buffer = io.StringIO()
+        manager.save_config(stream=buffer)
 
         # 加载并验证
-        with open(output_path, 'r', encoding='utf-8') as f:
-            saved_config = json.load(f)
+        saved_config = json.loads(buffer.getvalue())
 
         assert saved_config['base_selectors']['product_title'] == '.new-title'
 
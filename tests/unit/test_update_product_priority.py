@@ -0,0 +1,117 @@
+"""
+update_product_priority 脚本单元测试
+
+测试各名称扫描后端的批量分类结果与逐个分类一致。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scripts.update_product_priority import (
+    NAME_SCAN_BACKENDS,
+    classify_product_priority,
+    classify_products,
+    match_name_keywords
+)
+
+
+PRODUCTS = [
+    {'id': 'fiido-d11', 'name': 'Fiido D11 Folding Electric Bike', 'category': 'E-Bikes'},
+    {'id': 'fiido-t2', 'name': 'Fiido T2 Longtail Cargo Bike', 'category': 'E-Bikes'},
+    {'id': 'fiido-q1s', 'name': 'Fiido Q1S Electric Scooter', 'category': 'Scooters'},
+    {'id': 'fiido-titan-e-gravel', 'name': 'Fiido Titan E-Gravel', 'category': ''},
+    {'id': 'd11-battery', 'name': 'Fiido D11 Battery', 'category': 'Batteries Chargers'},
+    {'id': 'charger-42v', 'name': '42V Charger', 'category': ''},
+    {'id': 'rear-hub-motor', 'name': 'Rear Hub Motor', 'category': 'Replacement Parts'},
+    {'id': 'battery-lock', 'name': 'Battery Lock', 'category': 'Accessories'},
+    {'id': 'battery-cover', 'name': 'Battery Cover', 'category': ''},
+    {'id': 'battery-combo', 'name': 'Battery Combo Lock Set', 'category': ''},
+    {'id': 'rack-for-electric-bike', 'name': 'Rear Rack for Electric Bike', 'category': ''},
+    {'id': 'electric-bike-mirror', 'name': 'Electric Bike Mirror', 'category': ''},
+    {'id': 'city-bike-x', 'name': 'City Bike X', 'category': 'Accessories'},
+    {'id': 'mountain-bike-seatpost', 'name': 'Mountain Bike', 'category': ''},
+    {'id': 'spare-part', 'name': 'Spare Part', 'category': 'Motor Parts'},
+    {'id': 'brake-pad', 'name': 'Brake Pad', 'category': ''},
+    {'id': 'brake-pad-2', 'name': 'Brake Pad', 'category': 'Replacement Parts'},
+    {'id': 'e-bike-bremse', 'name': 'E-Bike Bremsbeläge für Fiido', 'category': ''},
+    {'id': 'gift-card', 'name': 'Gift Card', 'category': ''},
+    {'id': 'no-name'},
+]
+
+# 名称扫描的边界情况：关键词位于名称首尾、相邻名称、空名称、
+# 关键词被拆在两个相邻名称的首尾（拼接扫描时不能跨名称匹配）
+BOUNDARY_NAMES = [
+    'battery',
+    'battery',
+    'battery pack',
+    'spare battery',
+    '',
+    'fiido electric',
+    'bike',
+    'batt',
+    'ery',
+    'city bike',
+    'city bike',
+    '',
+    '',
+    'motor motor',
+    'charger for city bike',
+    'e-bike',
+    'lock',
+    'e-',
+    'gravel',
+    'electric bike',
+]
+
+BACKENDS = ['hyperscan', 'numba', 'blob', 'ahocorasick', 'regex']
+
+
+def _skip_unless_available(backend):
+    """后端依赖的可选库未安装时跳过"""
+    module = NAME_SCAN_BACKENDS[backend][0]
+    if module is not None:
+        pytest.importorskip(module)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_matches_single_product_classification(backend):
+    """测试强制使用各扫描后端时，批量分类结果与 classify_product_priority 一致"""
+    _skip_unless_available(backend)
+
+    expected = [classify_product_priority(p) for p in PRODUCTS]
+
+    assert classify_products(PRODUCTS, backend=backend) == expected
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_boundary_names(backend):
+    """测试边界名称上各扫描后端的关键词位标记与逐个匹配一致"""
+    _skip_unless_available(backend)
+    scan = NAME_SCAN_BACKENDS[backend][1]
+
+    assert scan(BOUNDARY_NAMES) == [match_name_keywords(name) for name in BOUNDARY_NAMES]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_boundary_products(backend):
+    """测试边界名称商品的批量分类结果与 classify_product_priority 一致"""
+    _skip_unless_available(backend)
+    products = [
+        {'id': f'product-{i}', 'name': name, 'category': ''}
+        for i, name in enumerate(BOUNDARY_NAMES)
+    ]
+
+    expected = [classify_product_priority(p) for p in products]
+
+    assert classify_products(products, backend=backend) == expected
+
+
+def test_unknown_backend_raises():
+    """测试未知的扫描后端名称抛出 ValueError"""
+    with pytest.raises(ValueError):
+        classify_products(PRODUCTS, backend='unknown')
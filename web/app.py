@@ -18,6 +18,8 @@ import threading
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from core.priority_overlay import apply_priority_overlay, load_priority_overlay
+
 app = Flask(__name__)
 CORS(app)  # 允许跨域访问
 
@@ -744,6 +746,8 @@ def list_products():
             products = data if isinstance(data, list) else []
             metadata = {}
 
+        apply_priority_overlay(products, load_priority_overlay(products_file))
+
         return jsonify({
             'products': products,
             'total': len(products),